@@ -0,0 +1,110 @@
+"""Compare page loads of the lean and full browser profiles on the fixture site.
+
+Loads every page of the site in one browser per profile, as crawl_url does,
+and reports load times, the peak RSS of the browser's process tree (Linux
+only), the assets the server had to deliver, and how many pages still
+showed all their forms. Pages carry images, a webfont and by default a
+script from an unroutable third-party host, which stalls a full load the
+way an unreachable CDN does. Needs Chrome.
+
+    python benchmarks/bench_browser_profile.py --pages 30 --assets 8 --asset-delay 0.05
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from fixture_server import FixtureServer, site_arguments, site_from_args
+from bench_form_prober import import_prober
+
+UNROUTABLE_SCRIPT = "http://10.255.255.1/lib.js"
+
+
+def process_tree(pid):
+    """pid and all its descendants, from /proc."""
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as file:
+                    stack.extend(int(child) for child in file.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def tree_rss_mb(pid):
+    total = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total / 1024
+
+
+def run_profile(prober, server, site, profile):
+    prober.BROWSER_PROFILE = profile
+    assets_before = server.counts["assets"]
+    start = time.perf_counter()
+    driver = prober.create_driver(None, prober.browser_scope(server.base_url.split("//", 1)[1]))
+    startup = time.perf_counter() - start
+    if driver is None:
+        raise SystemExit("Could not start Chrome")
+    loads, peak_rss, complete, failed = [], 0.0, 0, 0
+    try:
+        for index in range(site.pages):
+            url = server.base_url + site.path(index)
+            try:
+                loads.append(prober.load_page(driver, url))
+            except Exception as e:
+                failed += 1
+                print(f"  {profile}: {url} failed: {type(e).__name__}")
+                continue
+            if len(prober.browser_prober(driver, url).forms) == len(site.forms[index]):
+                complete += 1
+            peak_rss = max(peak_rss, tree_rss_mb(driver.service.process.pid))
+    finally:
+        driver.quit()
+    return {
+        "startup": startup,
+        "loads": loads,
+        "failed": failed,
+        "complete": complete,
+        "peak_rss": peak_rss,
+        "assets": server.counts["assets"] - assets_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lean and full browser profiles.")
+    site_arguments(parser)
+    parser.set_defaults(pages=30, assets=8, asset_delay=0.05, third_party=UNROUTABLE_SCRIPT)
+    parser.add_argument("--page-timeout", type=float, default=15, help="Seconds before a page load fails")
+    parser.add_argument("--profiles", default="full,lean", help="Comma-separated profiles to run, in order")
+    args = parser.parse_args()
+
+    site = site_from_args(args)
+    server = FixtureServer(site).start()
+    prober = import_prober(tempfile.mkdtemp(prefix="formprober-profile-"))
+    prober.PAGE_LOAD_TIMEOUT = args.page_timeout
+    print(f"Site: {site.pages} pages with {args.assets} images each, third-party script {args.third_party or 'none'}, "
+          f"served at {server.base_url}")
+    for profile in args.profiles.split(","):
+        stats = run_profile(prober, server, site, profile)
+        loads = sorted(stats["loads"]) or [0.0]
+        print(f"{profile:>5}: startup {stats['startup']:.2f}s, load mean {statistics.mean(loads):.3f}s "
+              f"p95 {loads[min(len(loads) - 1, int(len(loads) * 0.95))]:.3f}s, "
+              f"peak RSS {stats['peak_rss']:.0f} MB, {stats['assets']} assets served, "
+              f"{stats['complete']}/{site.pages} pages with all forms, {stats['failed']} failed")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
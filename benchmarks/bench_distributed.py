@@ -0,0 +1,103 @@
+"""Benchmark a distributed scan on one machine: a coordinator and several local worker processes.
+
+Serves the fixture site, starts webCrawler_formProber.py with --coordinator
+and --processes workers with --worker, and optionally SIGKILLs one worker
+after --kill-after seconds, leaving its leased URLs to expire and be handed
+to the others. Reports wall time, pages/sec and detection accuracy from the
+coordinator's JSONL results, plus how many pages were reported twice (should
+be 0) or never.
+
+    python benchmarks/bench_distributed.py --pages 200 --processes 4 --kill-after 3
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from fixture_server import FixtureServer, site_arguments, site_from_args
+from bench_form_prober import import_prober, score
+
+PROBER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "webCrawler_formProber.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start(args, workdir, log_name):
+    log = open(os.path.join(workdir, log_name), "w")
+    return subprocess.Popen([sys.executable, os.path.abspath(PROBER)] + args, cwd=workdir,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a coordinator with local worker processes.")
+    site_arguments(parser)
+    parser.add_argument("--processes", type=int, default=3, help="Worker processes")
+    parser.add_argument("--workers", type=int, default=2, help="Crawl workers per process")
+    parser.add_argument("--kill-after", type=float, help="SIGKILL the first worker process after this many seconds")
+    parser.add_argument("--lease-timeout", type=float, default=5, help="Coordinator lease timeout in seconds")
+    parser.add_argument("--browser-only", action="store_true", help="Probe every page in the browser instead of the HTTP fast path")
+    parser.add_argument("--workdir", help="Directory for logs and the Output folder (a temporary one by default)")
+    args = parser.parse_args()
+
+    site = site_from_args(args)
+    server = FixtureServer(site).start()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="formprober-distributed-")
+    address = f"127.0.0.1:{free_port()}"
+    print(f"Site: {site.pages} pages served at {server.base_url}; logs in {workdir}")
+
+    start_time = time.perf_counter()
+    coordinator = start([server.base_url + "/", "--coordinator", address, "--max-pages", str(site.pages),
+                         "--lease-timeout", str(args.lease_timeout), "--output-format", "jsonl"],
+                        workdir, "coordinator.log")
+    worker_args = ["--worker", f"http://{address}", "--workers", str(args.workers)]
+    if not args.browser_only:
+        worker_args.append("--http-first")
+    workers = [start(worker_args, workdir, f"worker-{i}.log") for i in range(args.processes)]
+
+    if args.kill_after is not None:
+        time.sleep(args.kill_after)
+        workers[0].send_signal(signal.SIGKILL)
+        print(f"Killed worker 0 after {args.kill_after:.1f}s")
+    coordinator.wait()
+    elapsed = time.perf_counter() - start_time
+    for worker in workers:
+        worker.wait(timeout=60)
+    server.shutdown()
+
+    results_path = os.path.join(workdir, "Output", f"{urlparse(server.base_url).netloc}_results.jsonl")
+    with open(results_path, encoding="utf-8") as file:
+        results = [json.loads(line) for line in file if line.strip()]
+    with open(os.path.join(workdir, "coordinator.log"), encoding="utf-8") as file:
+        log = file.read()
+    completed = re.findall(r" finished (\S+): \d+ results", log)
+    duplicates = len(completed) - len(set(completed))
+    expired = len(re.findall(r"Lease \S+ of \S+ held by .* expired", log))
+    pages_reported = {urlparse(result["url"]).path.rstrip("/") or "/" for result in results}
+
+    prober = import_prober(workdir)
+    scores, _ = score(results, site.expected(), set(prober.PAYLOADS.select("XSS")), set(prober.PAYLOADS.select("SQL")))
+    print(f"Elapsed:      {elapsed:.2f}s with {args.processes} worker processes x {args.workers} workers")
+    print(f"Pages:        {server.counts['pages']} fetched, {len(pages_reported)} with results "
+          f"({server.counts['pages'] / elapsed:.1f} pages/s), {site.pages - len(pages_reported)} unreported")
+    print(f"Leases:       {len(completed)} pages completed, {duplicates} twice, {expired} leases expired")
+    for test, counts in scores.items():
+        detected = counts["tp"] + counts["fp"]
+        actual = counts["tp"] + counts["fn"]
+        precision = counts["tp"] / detected if detected else 1.0
+        recall = counts["tp"] / actual if actual else 1.0
+        print(f"{test} accuracy: precision {precision:.2f}, recall {recall:.2f}  {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""End-to-end benchmark of crawl_website against the local fixture site.
+
+Reports pages/sec, form submissions/sec, peak RSS (this process and its
+largest finished child, i.e. Chrome/chromedriver) and detection accuracy
+per test against the site's ground truth, plus the slowest scan phases.
+
+    python benchmarks/bench_form_prober.py --pages 200 --workers 4
+    python benchmarks/bench_form_prober.py --browser-only   # needs Chrome
+
+By default the HTTP fast path is used, so only JavaScript-rendered pages need
+a browser; without Chrome those pages are reported as missed.
+"""
+import argparse
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from fixture_server import FixtureServer, site_arguments, site_from_args
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def import_prober(workdir):
+    """Import the prober with its Output directory inside workdir and no proxies."""
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+    import webCrawler_formProber as prober
+    logging.getLogger().setLevel(logging.WARNING)
+    prober.PROXY_MANAGER = None
+    return prober
+
+
+def score(results, expected, xss_payloads, sql_payloads):
+    """Per-test confusion counts over the pages that produced results."""
+    found = {}
+    for result in results:
+        path = urlparse(result["url"]).path.rstrip("/") or "/"
+        tests = found.setdefault(path, set())
+        if result["vulnerable"]:
+            if result["payload"] in xss_payloads:
+                tests.add("XSS")
+            if result["payload"] in sql_payloads:
+                tests.add("SQL")
+    scores = {}
+    for test in ("XSS", "SQL"):
+        counts = {"tp": 0, "fp": 0, "fn": 0, "tn": 0}
+        for path, vulnerable_to in expected.items():
+            actual = test in vulnerable_to
+            detected = test in found.get(path, ())
+            counts[("t" if actual == detected else "f") + ("p" if detected else "n")] += 1
+        scores[test] = counts
+    return scores, len(found)
+
+
+def peak_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawl_website against a synthetic local site.")
+    site_arguments(parser)
+    parser.add_argument("--workers", type=int, default=1, help="Crawl workers")
+    parser.add_argument("--pool-size", type=int, default=1, help="Browser pool size")
+    parser.add_argument("--browser-only", action="store_true", help="Probe every page in the browser instead of the HTTP fast path")
+    parser.add_argument("--payloads", action="append", default=[], help="Payload file or directory added to the built-in payloads (repeatable)")
+    parser.add_argument("--workdir", help="Directory for the prober's Output folder (a temporary one by default)")
+    args = parser.parse_args()
+
+    site = site_from_args(args)
+    server = FixtureServer(site).start()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="formprober-bench-")
+    payload_paths = [os.path.abspath(path) for path in args.payloads]  # before import_prober changes directory
+    prober = import_prober(workdir)
+    prober.METRICS.enable()
+    for path in payload_paths:
+        prober.PAYLOADS.add(path)
+    if args.payloads:
+        prober.DETECTOR = prober.build_detector(prober.PAYLOADS)
+
+    print(f"Site: {site.pages} pages, {len(site.js_pages)} JavaScript-rendered, served at {server.base_url}")
+    start = time.perf_counter()
+    sink = prober.crawl_website(server.base_url + "/", max_pages=site.pages, pool_size=args.pool_size,
+                                workers=args.workers, http_first=not args.browser_only)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    scores, probed_pages = score(sink.results, site.expected(), set(prober.PAYLOADS.select("XSS")),
+                                 set(prober.PAYLOADS.select("SQL")))
+    print(f"Elapsed:      {elapsed:.2f}s")
+    print(f"Pages:        {server.counts['pages']} fetched, {probed_pages} with results "
+          f"({server.counts['pages'] / elapsed:.1f} pages/s)")
+    print(f"Submissions:  {server.counts['submissions']} ({server.counts['submissions'] / elapsed:.1f} probes/s)")
+    print(f"Peak RSS:     {peak_rss_mb(resource.RUSAGE_SELF):.0f} MB self, "
+          f"{peak_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB largest child")
+    for test, counts in scores.items():
+        detected = counts["tp"] + counts["fp"]
+        actual = counts["tp"] + counts["fn"]
+        precision = counts["tp"] / detected if detected else 1.0
+        recall = counts["tp"] / actual if actual else 1.0
+        print(f"{test} accuracy: precision {precision:.2f}, recall {recall:.2f}  {counts}")
+
+    phases = prober.METRICS.to_dict()["phases"]
+    print("Slowest phases:")
+    for name, h in sorted(phases.items(), key=lambda item: -item[1]["sum"])[:8]:
+        print(f"  {name:<14} {h['count']:>6}x  total {h['sum']:8.2f}s  mean {h['mean'] * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
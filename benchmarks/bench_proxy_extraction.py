@@ -0,0 +1,85 @@
+"""Micro-benchmark: proxy extraction throughput on large raw proxy lists.
+
+Compares the original regex + is_valid_proxy approach against
+proxyExtractor's range-checked pattern, on a synthetic document that mixes
+valid proxies, out-of-range candidates and noise the way scraped GitHub
+lists and HTML pages do.
+
+    python benchmarks/bench_proxy_extraction.py --size-mb 100
+"""
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from proxyExtractor import extract_from_stream, extract_proxies  # noqa: E402
+
+NOISE = ["<tr><td>", "</td><td>", "HTTP", "elite proxy", "Germany", "\n", "# updated hourly", "1.2.3", "::1"]
+
+
+def legacy_find_proxies(text):
+    """The extraction code this module replaced, kept here as the baseline."""
+    def is_valid_proxy(proxy):
+        try:
+            ip, port = proxy.split(':')
+            if not (0 <= int(port) <= 65535):
+                return False
+            octets = ip.split('.')
+            return len(octets) == 4 and all(0 <= int(octet) <= 255 for octet in octets)
+        except (ValueError, IndexError):
+            return False
+    candidates = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}(?::\d{1,5})\b', text)
+    return [p for p in candidates if is_valid_proxy(p)]
+
+
+def generate_document(size_bytes, seed=0):
+    """Build a synthetic proxy-list document of roughly size_bytes."""
+    rng = random.Random(seed)
+    # Build one block and repeat it; real lists repeat heavily too.
+    lines = []
+    for _ in range(20000):
+        roll = rng.random()
+        if roll < 0.6:
+            lines.append(f"{rng.randint(1, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}."
+                         f"{rng.randint(0, 255)}:{rng.choice([80, 8080, 3128, 1080, rng.randint(1, 65535)])}")
+        elif roll < 0.7:
+            lines.append(f"{rng.randint(256, 999)}.{rng.randint(0, 255)}.1.1:{rng.randint(65536, 99999)}")
+        else:
+            lines.append(" ".join(rng.choice(NOISE) for _ in range(rng.randint(1, 6))))
+    block = ("\n".join(lines) + "\n").encode()
+    return block * max(1, size_bytes // len(block))
+
+
+def bench(label, func, size):
+    start = time.perf_counter()
+    found = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {size / elapsed / 1e6:8.1f} MB/s  {found:>9} unique proxies")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proxy extraction throughput.")
+    parser.add_argument("--size-mb", type=float, default=100, help="Size of the synthetic input")
+    parser.add_argument("--chunk-kb", type=int, default=1024, help="Chunk size for the streaming extractor")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only run the new extractor")
+    args = parser.parse_args()
+
+    document = generate_document(int(args.size_mb * 1e6))
+    size = len(document)
+    print(f"Input: {size / 1e6:.1f} MB")
+
+    if not args.skip_legacy:
+        text = document.decode()
+        bench("legacy regex + validation", lambda: len(set(legacy_find_proxies(text))), size)
+        del text
+    bench("extract_proxies (in memory)", lambda: len(extract_proxies(document)), size)
+    bench("extract_from_stream", lambda: len(extract_from_stream(io.BytesIO(document), args.chunk_kb * 1024)), size)
+
+
+if __name__ == "__main__":
+    main()
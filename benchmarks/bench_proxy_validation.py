@@ -0,0 +1,176 @@
+"""Benchmark proxyHunter's extract + validate steps against local stub proxies.
+
+Starts stub proxies on 127.0.0.1 of four kinds: working (answers 200 after
+a latency of up to --max-latency ms), refusing (closed port), hanging
+(accepts but never answers) and rejecting (answers 403). Their addresses
+are mixed into a noisy proxy-list document, which goes through
+find_proxies_in_text and validate_and_filter_proxies like a harvested
+page would. Reports throughput and whether exactly the working proxies
+survived, roughly fastest first.
+
+With --harvest-seconds, the document is also split into --sources parts
+arriving evenly over that time, like pages found by a harvest, and the time
+to the first working proxy and to the end of validation is compared
+between validating after the harvest and streaming each part into the
+validation pipeline as it arrives.
+
+    python benchmarks/bench_proxy_validation.py --working 500 --hanging 100
+    python benchmarks/bench_proxy_validation.py --harvest-seconds 20 --sources 40
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Never resolved: the stub proxies answer for it themselves
+TEST_URL = "http://proxy-bench.invalid/"
+
+
+class StubProxies:
+    """Stub HTTP proxies served from one asyncio loop in a background thread."""
+
+    def __init__(self, working, refusing, hanging, rejecting, max_latency=0.2, seed=0):
+        self.rng = random.Random(seed)
+        self.max_latency = max_latency
+        self.loop = asyncio.new_event_loop()
+        self.latency = {}
+        self.kinds = {}
+        threading.Thread(target=self.loop.run_forever, name="stub-proxies", daemon=True).start()
+        for kind, count in (("working", working), ("hanging", hanging), ("rejecting", rejecting)):
+            for _ in range(count):
+                port = asyncio.run_coroutine_threadsafe(self._listen(kind), self.loop).result()
+                self.kinds[f"127.0.0.1:{port}"] = kind
+        for _ in range(refusing):
+            self.kinds[f"127.0.0.1:{closed_port()}"] = "refusing"
+
+    def proxies(self, kind):
+        return [proxy for proxy, k in self.kinds.items() if k == kind]
+
+    async def _listen(self, kind):
+        latency = self.rng.uniform(0, self.max_latency)
+
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+                if kind == "hanging":
+                    await asyncio.sleep(3600)
+                await asyncio.sleep(latency)
+                status = b"200 OK" if kind == "working" else b"403 Forbidden"
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+                await writer.drain()
+            except (OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        self.latency[f"127.0.0.1:{port}"] = latency
+        return port
+
+
+def closed_port():
+    """A port nothing listens on (bound once, then released)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def proxy_document(proxies, noise_lines=20000, seed=0):
+    """A scraped-page-like document listing the proxies between noise lines."""
+    rng = random.Random(seed)
+    lines = [f"<tr><td>{proxy}</td><td>elite</td></tr>" for proxy in proxies]
+    lines += [f"<p>{rng.randint(256, 999)}.1.1.1:{rng.randint(1, 99999)} updated {rng.random():.4f}</p>"
+              for _ in range(noise_lines)]
+    rng.shuffle(lines)
+    return "\n".join(lines).encode()
+
+
+def simulated_harvest(hunter, document, sources, seconds, on_part):
+    """Call on_part(proxies) for each of ``sources`` slices of the document, spread evenly over ``seconds``."""
+    lines = document.split(b"\n")
+    step = -(-len(lines) // sources)
+    for i in range(sources):
+        time.sleep(seconds / sources)
+        on_part(hunter.find_proxies_in_text(b"\n".join(lines[i * step:(i + 1) * step])))
+
+
+def compare_streaming(hunter, document, args):
+    """Time to first working proxy and to the end: validate after the harvest vs. while harvesting."""
+    start = time.perf_counter()
+    parts = []
+    simulated_harvest(hunter, document, args.sources, args.harvest_seconds, parts.append)
+    pipeline = hunter.start_validation(TEST_URL, args.concurrency, args.timeout)
+    harvested = time.perf_counter() - start
+    for part in parts:
+        pipeline.submit(part)
+    pipeline.close()
+    batch = (harvested + pipeline.first_valid_after, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pipeline = hunter.start_validation(TEST_URL, args.concurrency, args.timeout)
+    simulated_harvest(hunter, document, args.sources, args.harvest_seconds, pipeline.submit)
+    pipeline.close()
+    streaming = (pipeline.first_valid_after, time.perf_counter() - start)
+
+    print(f"Harvest of {args.harvest_seconds:.0f}s in {args.sources} parts:")
+    for name, (first, total) in (("validate after", batch), ("streaming", streaming)):
+        print(f"  {name:<15} first working proxy after {first:6.2f}s, all validated after {total:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proxy extraction and validation against stub proxies.")
+    parser.add_argument("--working", type=int, default=300, help="Stub proxies that work")
+    parser.add_argument("--refusing", type=int, default=300, help="Addresses refusing connections")
+    parser.add_argument("--hanging", type=int, default=100, help="Stub proxies that never answer")
+    parser.add_argument("--rejecting", type=int, default=100, help="Stub proxies answering 403")
+    parser.add_argument("--max-latency", type=float, default=200, help="Max latency of a working stub in ms")
+    parser.add_argument("--concurrency", type=int, default=1000, help="Validation concurrency")
+    parser.add_argument("--timeout", type=float, default=2, help="Validation timeout in seconds")
+    parser.add_argument("--harvest-seconds", type=float, default=0, help="Also compare batch and streaming validation over a harvest this long")
+    parser.add_argument("--sources", type=int, default=20, help="Parts the simulated harvest delivers the document in")
+    args = parser.parse_args()
+
+    print("Starting stub proxies...")
+    stubs = StubProxies(args.working, args.refusing, args.hanging, args.rejecting, args.max_latency / 1000)
+    os.chdir(tempfile.mkdtemp(prefix="proxyhunter-bench-"))
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+    import webCrawler_proxyHunter as hunter
+    logging.getLogger().setLevel(logging.WARNING)
+
+    document = proxy_document(list(stubs.kinds))
+    start = time.perf_counter()
+    found = hunter.find_proxies_in_text(document)
+    extract_time = time.perf_counter() - start
+    print(f"Extraction:  {len(found)}/{len(stubs.kinds)} proxies from {len(document) / 1e6:.1f} MB "
+          f"in {extract_time * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    valid = hunter.validate_and_filter_proxies(found, TEST_URL, args.concurrency, args.timeout)
+    validate_time = time.perf_counter() - start
+    print(f"Validation:  {len(found)} proxies in {validate_time:.2f}s ({len(found) / validate_time:.0f} proxies/s, "
+          f"timeout {args.timeout}s)")
+
+    expected = set(stubs.proxies("working"))
+    missed, wrong = expected - set(valid), set(valid) - expected
+    ranked = [stubs.latency[proxy] for proxy in valid]
+    print(f"Accuracy:    {len(valid)} valid, {len(missed)} working proxies missed, {len(wrong)} broken accepted")
+    in_order = sum(a <= b for a, b in zip(ranked, ranked[1:]))
+    if len(ranked) > 1:
+        # Measured latency includes event-loop contention, so expect a rough order only
+        print(f"Ordering:    {in_order / (len(ranked) - 1):.0%} of neighbouring pairs ordered by stub latency")
+
+    if args.harvest_seconds > 0:
+        compare_streaming(hunter, document, args)
+
+
+if __name__ == "__main__":
+    main()
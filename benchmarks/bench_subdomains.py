@@ -0,0 +1,120 @@
+"""Benchmark subdomain enumeration offline against a stub DNS server and a local web server.
+
+The stub resolver answers for ``--hosts`` names drawn from the wordlist:
+a ``--live-ratio`` share points at 127.0.0.1, where the fixture site
+listens, the rest at 127.0.0.2, where nothing does. Every other name is
+NXDOMAIN, or with --wildcard resolves to 127.0.0.3. Each answer is delayed
+by ``--dns-latency`` seconds. Reports the live hosts found against the
+expected ones, DNS queries per second and the cache hits of the probes.
+
+    python benchmarks/bench_subdomains.py --hosts 200 --wildcard --dns-latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+from fixture_server import FixtureServer, FixtureSite
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from subdomainEnum import DnsResolver, SubdomainEnumerator, load_wordlists, TYPE_A, CLASS_IN, RCODE_NXDOMAIN
+
+WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "subdomains-10000.txt")
+LIVE_ADDRESS, DEAD_ADDRESS, WILDCARD_ADDRESS = "127.0.0.1", "127.0.0.2", "127.0.0.3"
+
+
+class StubDnsHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        server = self.server
+        query_id, _, _, _ = struct.unpack_from("!HHHH", data)
+        end = 12
+        labels = []
+        while data[end]:
+            labels.append(data[end + 1:end + 1 + data[end]].decode("ascii").lower())
+            end += data[end] + 1
+        question = data[12:end + 5]
+        name = ".".join(labels)
+        address = server.zone.get(name) or (WILDCARD_ADDRESS if server.wildcard and name.endswith(f".{server.domain}") else None)
+        time.sleep(server.latency)
+        with server.lock:
+            server.queries += 1
+        flags = 0x8180 if address else 0x8180 | RCODE_NXDOMAIN
+        answer = b""
+        if address:
+            # Name as a pointer to the question, then TYPE, CLASS, TTL, RDLENGTH and the address.
+            answer = struct.pack("!HHHIH", 0xC00C, TYPE_A, CLASS_IN, 60, 4) + socket.inet_aton(address)
+        sock.sendto(struct.pack("!HHHHHH", query_id, flags, 1, 1 if address else 0, 0, 0) + question + answer,
+                    self.client_address)
+
+
+class StubDnsServer(socketserver.ThreadingUDPServer):
+    """Authoritative-looking stub answering A queries from a dict."""
+
+    daemon_threads = True
+
+    def __init__(self, domain, zone, wildcard=False, latency=0.0):
+        super().__init__(("127.0.0.1", 0), StubDnsHandler)
+        self.domain = domain
+        self.zone = zone
+        self.wildcard = wildcard
+        self.latency = latency
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stub-dns", daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark subdomain enumeration against a stub resolver.")
+    parser.add_argument("--domain", default="example.test", help="Base domain to enumerate")
+    parser.add_argument("--wordlist", default=WORDLIST, help="Wordlist to enumerate with")
+    parser.add_argument("--hosts", type=int, default=200, help="Names from the wordlist that exist")
+    parser.add_argument("--live-ratio", type=float, default=0.5, help="Share of existing names serving HTTP")
+    parser.add_argument("--wildcard", action="store_true", help="Answer every other name with a wildcard address")
+    parser.add_argument("--dns-latency", type=float, default=0.01, help="Seconds before the stub answers")
+    parser.add_argument("--concurrency", type=int, default=500, help="DNS queries in flight")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    words = load_wordlists([args.wordlist])
+    rng = random.Random(args.seed)
+    existing = rng.sample(words, min(args.hosts, len(words)))
+    live = set(existing[:int(len(existing) * args.live_ratio)])
+    zone = {f"{word}.{args.domain}": LIVE_ADDRESS if word in live else DEAD_ADDRESS for word in existing}
+    dns = StubDnsServer(args.domain, zone, args.wildcard, args.dns_latency).start()
+    web = FixtureServer(FixtureSite(pages=1)).start()
+    port = web.server_address[1]
+
+    found = []
+    enumerator = SubdomainEnumerator(args.domain, words, DnsResolver([f"127.0.0.1:{dns.server_address[1]}"],
+                                                                     concurrency=args.concurrency),
+                                     on_live=found.append, schemes=[("http", port)])
+    start = time.perf_counter()
+    asyncio.run(enumerator.run())
+    elapsed = time.perf_counter() - start
+    dns.shutdown()
+    web.shutdown()
+
+    expected = {f"http://{word}.{args.domain}:{port}/" for word in live}
+    resolver = enumerator.resolver
+    print(f"Candidates:   {len(words) + 1} names under {args.domain}, {len(existing)} existing, {len(live)} live"
+          + (", wildcard DNS" if args.wildcard else ""))
+    print(f"Elapsed:      {elapsed:.2f}s ({dns.queries / elapsed:.0f} DNS queries/s at {args.dns_latency * 1000:.0f} ms latency)")
+    print(f"DNS:          {resolver.queries} queries sent, {dns.queries} answered, {resolver.cache_hits} cache hits, "
+          f"{resolver.failures} failed")
+    print(f"Resolved:     {len(enumerator.resolved)} names, {enumerator.wildcard_matches} wildcard matches dropped")
+    print(f"Live:         {len(set(found) & expected)}/{len(expected)} found, {len(set(found) - expected)} unexpected, "
+          f"{len(found) - len(set(found))} reported twice")
+
+
+if __name__ == "__main__":
+    main()
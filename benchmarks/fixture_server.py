@@ -0,0 +1,239 @@
+"""Local HTTP server generating a synthetic site for benchmarking the prober.
+
+Every page links to ``fanout`` child pages plus one random earlier page and
+carries ``forms_per_page`` forms of one of three kinds:
+
+* reflect - echoes the submitted value unescaped (reflected XSS)
+* sqlerr  - answers a quote in any field with a database error message
+* safe    - escapes the submitted value and never errors
+
+A ``js_ratio`` share of the pages builds its forms from JavaScript and
+marks itself as a single-page app, so the HTTP fast path has to hand it to
+the browser. ``FixtureSite.expected`` holds the ground truth per page.
+
+With ``assets`` every page also pulls in that many images, a stylesheet
+with a webfont (all served after ``asset_delay`` seconds) and, given
+``third_party``, a blocking script from that URL, like a real page would.
+
+    python benchmarks/fixture_server.py --pages 200 --port 8000
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+FORM_KINDS = ("reflect", "sqlerr", "safe")
+
+SQL_ERROR = ("You have an error in your SQL syntax; check the manual that corresponds to your "
+             "MySQL server version for the right syntax to use near '%s' at line 1")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Fixture page {index}</title>{head}</head>
+<body>
+<h1>Fixture page {index}</h1>
+{content}
+<ul>{links}</ul>
+</body></html>"""
+
+ASSET_TYPES = {".png": "image/png", ".woff2": "font/woff2", ".css": "text/css"}
+ASSET_SIZE = 32 * 1024
+STYLESHEET = ("@font-face { font-family: Fixture; src: url(/asset/font.woff2) format('woff2'); }\n"
+              "body { font-family: Fixture, sans-serif; }\n")
+
+JS_FORMS_TEMPLATE = """<div id="app" data-v-app></div>
+<script>
+document.addEventListener("DOMContentLoaded", function () {{
+  document.getElementById("app").innerHTML = {forms};
+}});
+</script>"""
+
+
+class FixtureSite:
+    """Deterministic synthetic site: page layout, form kinds and the expected findings."""
+
+    def __init__(self, pages=100, forms_per_page=2, fanout=4, js_ratio=0.2, xss_ratio=0.3, sql_ratio=0.3,
+                 seed=0, assets=0, asset_delay=0.0, third_party=None):
+        rng = random.Random(seed)
+        self.pages = max(1, pages)
+        self.fanout = fanout
+        self.assets = assets
+        self.asset_delay = asset_delay
+        self.third_party = third_party
+        self.forms = []
+        self.js_pages = set()
+        self.back_links = []
+        for index in range(self.pages):
+            kinds = []
+            for _ in range(forms_per_page):
+                roll = rng.random()
+                kinds.append("reflect" if roll < xss_ratio else "sqlerr" if roll < xss_ratio + sql_ratio else "safe")
+            self.forms.append(kinds)
+            if index and rng.random() < js_ratio:
+                self.js_pages.add(index)
+            self.back_links.append(rng.randrange(index) if index else None)
+
+    def path(self, index):
+        return "/" if index == 0 else f"/page/{index}"
+
+    def expected(self):
+        """Map each page path to the set of tests ("XSS", "SQL") that should find it vulnerable."""
+        return {self.path(i): {test for kind, test in (("reflect", "XSS"), ("sqlerr", "SQL")) if kind in kinds}
+                for i, kinds in enumerate(self.forms)}
+
+    def render_page(self, index):
+        children = range(index * self.fanout + 1, min(self.pages, (index + 1) * self.fanout + 1))
+        targets = list(children) + ([self.back_links[index]] if self.back_links[index] is not None else [])
+        links = "".join(f'<li><a href="{self.path(t)}">Page {t}</a></li>' for t in targets)
+        forms = "\n".join(self._render_form(index, n, kind) for n, kind in enumerate(self.forms[index]))
+        head, images = self._render_assets(index)
+        if index in self.js_pages:
+            # Only a string literal in the served HTML; the forms exist once the script ran
+            return PAGE_TEMPLATE.format(index=index, head=head, links=links,
+                                        content=JS_FORMS_TEMPLATE.format(forms=json.dumps(forms)) + images)
+        return PAGE_TEMPLATE.format(index=index, head=head, links=links, content=forms + images)
+
+    def _render_assets(self, index):
+        if not self.assets:
+            return "", ""
+        head = '<link rel="stylesheet" href="/asset/style.css">'
+        if self.third_party:
+            head += f'<script src="{html.escape(self.third_party)}"></script>'
+        images = "".join(f'<img src="/asset/{index}-{n}.png" alt="">' for n in range(self.assets))
+        return head, images
+
+    @staticmethod
+    def _render_form(index, number, kind):
+        method = "post" if number % 2 else "get"
+        return (f'<form action="/{kind}/{index}/{number}" method="{method}">'
+                f'<input type="text" name="q"><input type="hidden" name="token" value="t{index}">'
+                f'<input type="submit" value="Go"></form>')
+
+    @staticmethod
+    def render_response(kind, values):
+        submitted = " ".join(value for name, value in values if name != "token")
+        if kind == "reflect":
+            body = f"<p>Results for {submitted}</p>"
+        elif kind == "sqlerr" and "'" in submitted:
+            body = f"<p>{html.escape(SQL_ERROR % submitted)}</p>"
+        else:
+            body = f"<p>Results for {html.escape(submitted)}</p>"
+        return f"<!DOCTYPE html><html><head><title>Response</title></head><body>{body}</body></html>"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self._route(parsed.path, parse_qsl(parsed.query, keep_blank_values=True))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8", "replace")
+        self._route(urlparse(self.path).path, parse_qsl(body, keep_blank_values=True))
+
+    def _route(self, path, values):
+        site = self.server.site
+        parts = [part for part in path.split("/") if part]
+        if not parts:
+            self._send(200, site.render_page(0), "pages")
+        elif parts[0] == "page" and len(parts) == 2 and parts[1].isdigit() and int(parts[1]) < site.pages:
+            self._send(200, site.render_page(int(parts[1])), "pages")
+        elif parts[0] in FORM_KINDS:
+            self._send(200, site.render_response(parts[0], values), "submissions")
+        elif parts[0] == "asset" and len(parts) == 2:
+            self._send_asset(parts[1])
+        else:
+            self._send(404, "<html><body>Not found</body></html>", None)
+
+    def _send(self, status, body, counter):
+        if counter:
+            self.server.count(counter)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_asset(self, name):
+        time.sleep(self.server.site.asset_delay)
+        extension = name[name.rfind("."):]
+        data = STYLESHEET.encode("utf-8") if extension == ".css" else bytes(ASSET_SIZE)
+        self.server.count("assets")
+        self.send_response(200)
+        self.send_header("Content-Type", ASSET_TYPES.get(extension, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded server for a FixtureSite that counts pages served and form submissions."""
+
+    daemon_threads = True
+
+    def __init__(self, site, host="127.0.0.1", port=0):
+        super().__init__((host, port), FixtureHandler)
+        self.site = site
+        self.counts = {"pages": 0, "submissions": 0, "assets": 0}
+        self._count_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name):
+        with self._count_lock:
+            self.counts[name] += 1
+
+    def start(self):
+        """Serve from a daemon thread; returns the server."""
+        threading.Thread(target=self.serve_forever, name="fixture-server", daemon=True).start()
+        return self
+
+
+def site_arguments(parser):
+    """Add the site-shape options shared by the fixture benchmarks."""
+    parser.add_argument("--pages", type=int, default=100, help="Pages in the synthetic site")
+    parser.add_argument("--forms-per-page", type=int, default=2, help="Forms on every page")
+    parser.add_argument("--fanout", type=int, default=4, help="Child pages linked from every page")
+    parser.add_argument("--js-ratio", type=float, default=0.2, help="Share of pages whose forms are rendered by JavaScript")
+    parser.add_argument("--xss-ratio", type=float, default=0.3, help="Share of forms reflecting input unescaped")
+    parser.add_argument("--sql-ratio", type=float, default=0.3, help="Share of forms answering quotes with an SQL error")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the site layout")
+    parser.add_argument("--assets", type=int, default=0, help="Images per page, plus a stylesheet with a webfont when non-zero")
+    parser.add_argument("--asset-delay", type=float, default=0.0, help="Seconds before each asset is served")
+    parser.add_argument("--third-party", metavar="URL", help="Script every page with assets loads from another host")
+
+
+def site_from_args(args):
+    return FixtureSite(args.pages, args.forms_per_page, args.fanout, args.js_ratio, args.xss_ratio,
+                       args.sql_ratio, args.seed, args.assets, args.asset_delay, args.third_party)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic vulnerable site for benchmarking.")
+    site_arguments(parser)
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args()
+    server = FixtureServer(site_from_args(args), port=args.port)
+    print(f"Serving {args.pages} pages on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def start_async_thread(main, name, description, on_finished=None):
+    """Run the coroutine function ``main`` on its own event loop in a daemon thread.
+
+    A failure is logged as "<description> failed". ``on_finished`` is called
+    once the loop is done, however it ended. Returns the started thread.
+    """
+    def run():
+        try:
+            asyncio.run(main())
+        except Exception as e:
+            logger.error(f"{description} failed: {e}")
+        finally:
+            if on_finished:
+                on_finished()
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
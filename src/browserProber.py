@@ -0,0 +1,306 @@
+import logging
+from contextlib import nullcontext
+from itertools import islice
+from urllib.parse import urlparse
+from selenium.common.exceptions import UnexpectedAlertPresentException, WebDriverException
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from httpProber import BASELINE_VALUE, INJECTABLE_TYPES
+from pageReadiness import prepare_settle_wait, wait_for_settle, dismiss_alert
+from responseDetector import PageSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Describes every form, plus inputs outside of any form as one pseudo-form
+# with index -1. Field positions index into form.elements (or the loose list).
+SNAPSHOT_FORMS_SCRIPT = """
+function fieldsOf(elements) {
+    return Array.prototype.map.call(elements, function (e, position) {
+        return {position: position, name: e.name || e.id || '', type: (e.type || '').toLowerCase(),
+                value: e.value === undefined ? null : e.value, checked: !!e.checked};
+    });
+}
+var forms = Array.prototype.map.call(document.forms, function (form, index) {
+    return {index: index, action: form.action || location.href, method: (form.method || 'get').toLowerCase(),
+            fields: fieldsOf(form.elements)};
+});
+var loose = Array.prototype.filter.call(document.querySelectorAll('input, textarea'), function (e) { return !e.form; });
+if (loose.length) {
+    forms.push({index: -1, action: location.href, method: 'get', fields: fieldsOf(loose)});
+}
+return forms;
+"""
+
+# The elements of form arguments[0] (-1 for the loose inputs), or null when
+# the form is not on the current page (any more).
+FORM_ELEMENTS_SCRIPT = """
+var index = arguments[0], expected = arguments[1];
+var elements = index >= 0
+    ? (document.forms[index] ? document.forms[index].elements : null)
+    : Array.prototype.filter.call(document.querySelectorAll('input, textarea'), function (e) { return !e.form; });
+return elements && elements.length === expected ? Array.prototype.slice.call(elements) : null;
+"""
+
+# Puts the snapshotted values back and lets frameworks know about it.
+RESTORE_FORM_SCRIPT = """
+var elements = arguments[0], fields = arguments[1];
+fields.forEach(function (field) {
+    var e = elements[field.position];
+    if (!e || field.value === null) { return; }
+    if (e.type === 'checkbox' || e.type === 'radio') { e.checked = field.checked; }
+    else if (e.type !== 'file') { e.value = field.value; }
+    e.dispatchEvent(new Event('input', {bubbles: true}));
+});
+"""
+
+# The probed form as a WebElement, for cropping screenshots to it; -1 marks loose inputs
+FORM_ELEMENT_SCRIPT = "return arguments[0] >= 0 ? document.forms[arguments[0]] || null : null;"
+
+FORM_WAIT_TIMEOUT = 5
+SOURCE_ATTEMPTS = 3  # Reads of the page source, each after dismissing dialogs that opened late
+
+
+class BrowserProber:
+    """Runs a full payload matrix against the forms of one loaded page.
+
+    The forms are snapshotted once. Each payload is then typed into one
+    injectable field at a time and submitted. Before the next submission the
+    form is put back in its snapshotted state: in place with JavaScript when
+    the submission stayed on the page, via history navigation when it
+    navigated away, and only reloaded when going back does not bring the form
+    back. Each form is also submitted once with a harmless value, and every
+    payload response is judged against that baseline. One result is
+    reported per form and payload, listing the fields that turned out
+    vulnerable. A submission the browser fails on is logged and skipped, so
+    the verdicts gathered so far are kept. Phases are timed on ``metrics``
+    (a ScanMetrics) when given.
+    """
+
+    def __init__(self, driver, url, settle_timeout=10.0, settle_quiet=0.15, metrics=None):
+        self.driver = driver
+        self.metrics = metrics
+        self.url = url
+        self.settle_timeout = settle_timeout
+        self.settle_quiet = settle_quiet
+        self.page_url = driver.current_url
+        snapshot = driver.execute_script(SNAPSHOT_FORMS_SCRIPT) or []
+        self.form_count = sum(1 for form in snapshot if form["index"] >= 0)
+        self.forms = [form for form in snapshot
+                      if any(field["type"] in INJECTABLE_TYPES for field in form["fields"])]
+        self.submissions = 0
+        self.history_resets = 0
+        self.reloads = 0
+
+    def probe(self, test_name, payloads, detect, screenshot=None, form_cache=None, spot_check=1):
+        """Submit every payload through every injectable field of every form.
+
+        ``payloads`` is a list, or a callable ``payloads(fields, baseline)``
+        picking them per form from its injectable fields and baseline.
+        ``detect(payload, snapshot, baseline)`` judges a single submission,
+        both given as PageSnapshots, and returns the evidence found (empty
+        if none). ``screenshot(driver, vulnerable, form_element)`` is called
+        once per form and payload: after its first vulnerable submission, or
+        after the last one. ``form_element()`` returns the form's element if
+        it is still on the page; the path of a screenshot taken is returned
+        and reported with the result. Forms with a fingerprint (see
+        set_fingerprints) already claimed in ``form_cache`` only get the
+        first ``spot_check`` payloads, or are skipped when that is 0, as in
+        HttpProber.probe.
+        """
+        if not self.forms:
+            logger.info(f"No input fields found on {self.url}, skipping {test_name} test.")
+            return [{
+                "url": self.url,
+                "payload": "N/A",
+                "vulnerable": False,
+                "status": "No Inputs",
+                "response_snippet": "",
+                "console_logs": []
+            }]
+
+        results = []
+        for form in self.forms:
+            fingerprint = form.get("fingerprint")
+            limit, claimed = None, False
+            if form_cache and fingerprint:
+                claimed = form_cache.claim(fingerprint, test_name)
+                if not claimed:
+                    limit = spot_check
+                    if limit <= 0:
+                        logger.info(f"Skipping {test_name} test of known form {form['action']} on {self.url}")
+                        continue
+            form_results = []
+            try:
+                form_results = self._probe_form(form, payloads, detect, screenshot, limit)
+            finally:
+                if claimed:
+                    # Only a probe that produced verdicts makes the form count as tested.
+                    form_cache.settle(fingerprint, test_name, bool(form_results))
+            results.extend(form_results)
+        logger.debug(f"{self.url}: {self.submissions} submissions, {self.history_resets} history resets, "
+                     f"{self.reloads} reloads")
+        return results
+
+    def set_fingerprints(self, fingerprints):
+        """Attach form-cache fingerprints, given by form index as from page_form_fingerprints.
+
+        They are matched by the position of each form on the page, so when
+        the parsed page does not have the same number of forms as the live
+        one no form gets a fingerprint (and every form a full probe).
+        """
+        if sum(1 for index in fingerprints if index >= 0) != self.form_count:
+            logger.debug(f"Form count of {self.url} differs from its parsed source; not using the form cache")
+            return
+        for form in self.forms:
+            if form["index"] in fingerprints:
+                form["fingerprint"] = fingerprints[form["index"]]
+
+    def _probe_form(self, form, payloads, detect, screenshot, limit):
+        form_name = form["action"] if form["index"] >= 0 else "inputs outside of a form"
+        fields = [field for field in form["fields"] if field["type"] in INJECTABLE_TYPES]
+        baseline = self._baseline(form, fields[0])
+        results = []
+        for payload in islice(payloads(fields, baseline) if callable(payloads) else payloads, limit):
+            vulnerable_fields, evidence, reported, shot = [], set(), None, None
+            for field in fields:
+                if form.get("gone"):
+                    break
+                submitted = self._try_submit(form, field, payload)
+                if submitted is None:
+                    continue
+                snapshot, settle_time = submitted
+                found = detect(payload, snapshot, baseline)
+                if found:
+                    vulnerable_fields.append(field["name"] or f"#{field['position']}")
+                    evidence |= set(found)
+                if reported is None or (found and not reported[0]):
+                    reported = (bool(found), snapshot, settle_time)
+                    if found and screenshot:
+                        shot = screenshot(self.driver, True, lambda: self._form_element(form))
+            if reported is None:
+                continue
+            vulnerable, snapshot, settle_time = reported
+            if screenshot and not vulnerable:
+                shot = screenshot(self.driver, False, lambda: self._form_element(form))
+            result_status = "Vulnerable" if vulnerable else "Not Vulnerable"
+            logger.info(f"Tested {self.url} ({urlparse(form_name).path or form_name}) with payload {payload}: "
+                        f"{result_status}" + (f" via {', '.join(vulnerable_fields)}" if vulnerable_fields else ""))
+            results.append({
+                "url": self.url,
+                "form": form_name,
+                "payload": payload,
+                "vulnerable": vulnerable,
+                "status": result_status,
+                "vulnerable_fields": vulnerable_fields,
+                "evidence": sorted(evidence),
+                "response_snippet": snapshot.source[:200],
+                "console_logs": snapshot.console_logs[:5],
+                "settle_time": round(settle_time, 3)
+            })
+            if shot:
+                results[-1]["screenshot"] = shot
+        return results
+
+    def _baseline(self, form, field):
+        """The form's response to a harmless value, captured once and shared by all tests."""
+        if "baseline" not in form:
+            submitted = self._try_submit(form, field, BASELINE_VALUE)
+            form["baseline"] = submitted[0] if submitted else None
+        return form["baseline"]
+
+    def _try_submit(self, form, field, value):
+        """_submit, returning None when the browser fails on the submission."""
+        try:
+            return self._submit(form, field, value)
+        except WebDriverException as e:
+            logger.warning(f"Submission to form {form['action']} on {self.url} failed: {e.msg or e}")
+            try:
+                # Leave no dialog open for the next submission's restore.
+                dismiss_alert(self.driver)
+            except WebDriverException:
+                pass
+            return None
+
+    def _submit(self, form, field, value):
+        """Type a value into one field of a freshly restored form and submit it.
+
+        Returns (PageSnapshot, settle time), or None when the form could not
+        be restored or the field not be filled.
+        """
+        with self._span("form_reset"):
+            elements = self._restore(form)
+        if elements is None:
+            logger.warning(f"Form {form['action']} is gone from {self.url}, skipping its remaining payloads")
+            form["gone"] = True
+            return None
+        start_url = prepare_settle_wait(self.driver)
+        try:
+            with self._span("inject"):
+                element = elements[field["position"]]
+                element.clear()
+                element.send_keys(value)
+                element.send_keys(Keys.RETURN)
+        except Exception as e:
+            logger.warning(f"Failed to inject payload on {self.url}: {e}")
+            return None
+        self.submissions += 1
+        if self.metrics:
+            self.metrics.count("submissions")
+        with self._span("settle_wait"):
+            settle_time, settle_reason = wait_for_settle(self.driver, start_url, self.settle_timeout,
+                                                         self.settle_quiet)
+        alert_text = dismiss_alert(self.driver) if settle_reason == "alert" else None
+        logger.debug(f"Page settled after {settle_time:.3f}s ({settle_reason})")
+        with self._span("page_source"):
+            for attempt in range(SOURCE_ATTEMPTS):
+                try:
+                    source = self.driver.page_source
+                    logs = self.driver.get_log("browser")
+                    break
+                except UnexpectedAlertPresentException as e:
+                    # A dialog opened after settling, e.g. by a second reflection of the payload.
+                    if attempt == SOURCE_ATTEMPTS - 1:
+                        raise
+                    late_text = dismiss_alert(self.driver) or e.alert_text
+                    alert_text = alert_text if alert_text is not None else late_text
+        return PageSnapshot(source, logs, alert_text), settle_time
+
+    def _restore(self, form):
+        """Bring the form back in its snapshotted state; returns its elements or None."""
+        elements = self._form_elements(form)
+        if elements is None and self.driver.current_url != self.page_url:
+            self.driver.back()
+            elements = self._wait_for_form(form)
+            if elements is not None:
+                self.history_resets += 1
+        if elements is None:
+            self.driver.get(self.page_url)
+            elements = self._wait_for_form(form)
+            if elements is None:
+                return None
+            self.reloads += 1
+        self.driver.execute_script(RESTORE_FORM_SCRIPT, elements, form["fields"])
+        return elements
+
+    def _span(self, name):
+        return self.metrics.span(name) if self.metrics else nullcontext()
+
+    def _form_elements(self, form):
+        try:
+            if self.driver.current_url != self.page_url:
+                return None
+            return self.driver.execute_script(FORM_ELEMENTS_SCRIPT, form["index"], len(form["fields"]))
+        except Exception as e:
+            logger.debug(f"Could not look up form {form['index']} on {self.url}: {e}")
+            return None
+
+    def _form_element(self, form):
+        if self.driver.current_url != self.page_url:
+            return None
+        return self.driver.execute_script(FORM_ELEMENT_SCRIPT, form["index"])
+
+    def _wait_for_form(self, form):
+        try:
+            return WebDriverWait(self.driver, FORM_WAIT_TIMEOUT).until(lambda d: self._form_elements(form))
+        except Exception:
+            return None
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+
+class CrawlScheduler:
+    """Thread-safe crawl frontier shared by concurrent browser workers.
+
+    URLs are queued per host and handed out round-robin, never letting more
+    than ``per_host_limit`` pages of one host be in flight at once. A URL is
+    only ever queued once, deduplicated on ``normalize(url)``; it is handed
+    out as given, so relative links still resolve against it. ``next_url``
+    returns None once ``max_pages`` have been handed out, ``should_stop``
+    returns True, or the frontier is empty with no page in flight and no
+    producer (such as the link discovery stage) still open that could add
+    new links.
+    """
+
+    def __init__(self, start_urls, max_pages=100, per_host_limit=4, should_stop=None, normalize=None,
+                 on_new=None):
+        self.max_pages = max_pages
+        self.per_host_limit = max(1, per_host_limit)
+        self.should_stop = should_stop or (lambda: False)
+        self.normalize = normalize or (lambda url: url)
+        self.on_new = on_new
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._host_active = {}
+        self._seen = set()
+        self._claimed = 0
+        self._active = 0
+        self._producers = 0
+        self.add(start_urls)
+
+    @property
+    def visited(self):
+        """Number of URLs handed out to workers so far."""
+        with self._cond:
+            return self._claimed
+
+    @property
+    def finished(self):
+        """True once no further URL will be handed out, unless one is requeued."""
+        with self._cond:
+            return self._finished()
+
+    def add(self, urls):
+        """Queue URLs that have not been seen before, reporting them to ``on_new``."""
+        with self._cond:
+            added = []
+            for url in urls:
+                key = self.normalize(url)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                self._queues.setdefault(urlparse(key).netloc, deque()).append(url)
+                added.append(url)
+            if added:
+                if self.on_new:
+                    self.on_new(added)
+                self._cond.notify_all()
+
+    def mark_visited(self, urls):
+        """Treat URLs crawled by an earlier, interrupted run as already handed out."""
+        with self._cond:
+            for url in urls:
+                key = self.normalize(url)
+                if key not in self._seen:
+                    self._seen.add(key)
+                    self._claimed += 1
+
+    def next_url(self, poll_interval=0.5, timeout=None):
+        """Block until a URL can be crawled; return None when the crawl is over.
+
+        With a ``timeout``, None is also returned when no URL became
+        available in time; ``finished`` tells the two apart.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                if self.should_stop() or self._claimed >= self.max_pages:
+                    return None
+                url = self._pop_eligible()
+                if url is not None:
+                    self._claimed += 1
+                    self._active += 1
+                    host = self._host(url)
+                    self._host_active[host] = self._host_active.get(host, 0) + 1
+                    return url
+                if self._finished():
+                    return None
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+                # Wake up periodically so a SIGINT flag is noticed promptly.
+                self._cond.wait(poll_interval)
+
+    def done(self, url):
+        """Mark a URL handed out by next_url as finished."""
+        with self._cond:
+            self._active -= 1
+            host = self._host(url)
+            self._host_active[host] -= 1
+            self._cond.notify_all()
+
+    def requeue(self, url):
+        """Hand a URL given out by next_url back to the front of its host's queue, e.g. after its worker died."""
+        with self._cond:
+            self._claimed -= 1
+            self._active -= 1
+            host = self._host(url)
+            self._host_active[host] -= 1
+            self._queues.setdefault(host, deque()).appendleft(url)
+            self._cond.notify_all()
+
+    def open_producer(self):
+        """Register a source that may still add URLs while no page is in flight."""
+        with self._cond:
+            self._producers += 1
+
+    def close_producer(self):
+        with self._cond:
+            self._producers -= 1
+            self._cond.notify_all()
+
+    def _host(self, url):
+        return urlparse(self.normalize(url)).netloc
+
+    def _finished(self):
+        return (self.should_stop() or self._claimed >= self.max_pages or
+                (self._active == 0 and self._producers == 0 and not any(self._queues.values())))
+
+    def _pop_eligible(self):
+        for host, queue in self._queues.items():
+            if queue and self._host_active.get(host, 0) < self.per_host_limit:
+                url = queue.popleft()
+                # Rotate the host to the back so hosts are served round-robin.
+                del self._queues[host]
+                self._queues[host] = queue
+                return url
+        return None
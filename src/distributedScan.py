@@ -0,0 +1,328 @@
+import hmac
+import ipaddress
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import requests
+
+logger = logging.getLogger(__name__)
+
+LEASE_TIMEOUT = 120  # Seconds a leased URL may go without a renewal before it is handed to another worker
+LEASE_POLL = 5  # Seconds a lease request waits for work before the worker is told to ask again
+MAX_LEASE_ATTEMPTS = 3  # Leases of one URL that may expire before it is given up on
+TOKEN_HEADER = "X-Scan-Token"
+FINISH_GRACE = 2  # Seconds the API stays up after the scan so polling workers hear that it is over
+COORDINATOR_RETRIES = 5  # Attempts to reach the coordinator before a worker thread gives up
+
+
+def is_loopback(host):
+    """Whether a bind address only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class ScanCoordinator:
+    """Owns a scan's frontier and results and leases URLs to remote workers.
+
+    Workers lease one URL at a time, renew their leases while probing, and
+    report the page's results and links back. A lease that is not renewed
+    within ``lease_timeout`` seconds, because its worker died or hung, puts
+    the URL back at the front of the frontier; after ``max_attempts``
+    expired leases the URL is given up on. Results of an expired lease are
+    rejected, so every page is reported once. Results go to ``sink`` and
+    completed pages to ``checkpoint`` exactly as in a local crawl. Reported
+    links are only queued when they point to one of ``hosts`` (netlocs), so
+    a client cannot steer the workers off the scan's scope.
+    """
+
+    def __init__(self, scheduler, sink, checkpoint=None, info=None, lease_timeout=LEASE_TIMEOUT,
+                 max_attempts=MAX_LEASE_ATTEMPTS, token=None, hosts=()):
+        self.scheduler = scheduler
+        self.hosts = set(hosts)
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.info = dict(info or {}, lease_timeout=lease_timeout)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.token = token
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._leases = {}  # lease id -> (url, worker, expiry)
+        self._attempts = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def finished(self):
+        """True once every URL has been handed out and reported, or the scan was stopped."""
+        with self._lock:
+            leased = bool(self._leases)
+        return self.scheduler.finished and (not leased or self.scheduler.should_stop())
+
+    def lease(self, worker):
+        """Lease the next URL to a worker: {"lease", "url"}, {"wait": seconds} or {"done": True}."""
+        url = self.scheduler.next_url(timeout=LEASE_POLL)
+        if url is None:
+            return {"done": True} if self.finished else {"wait": 1}
+        with self._lock:
+            lease_id = str(next(self._ids))
+            self._leases[lease_id] = (url, worker, time.monotonic() + self.lease_timeout)
+            self._attempts[url] = self._attempts.get(url, 0) + 1
+        logger.info(f"Leased {url} to {worker}")
+        return {"lease": lease_id, "url": url}
+
+    def renew(self, lease_ids):
+        """Extend leases still held; returns the ids that were renewed."""
+        renewed = []
+        with self._lock:
+            for lease_id in lease_ids:
+                if lease_id in self._leases:
+                    url, worker, _ = self._leases[lease_id]
+                    self._leases[lease_id] = (url, worker, time.monotonic() + self.lease_timeout)
+                    renewed.append(lease_id)
+        return renewed
+
+    def complete(self, lease_id, results, links):
+        """Record a leased page's results and links; False if the lease had already expired."""
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+        if lease is None:
+            logger.warning(f"Rejected results of expired lease {lease_id}")
+            return False
+        url, worker, _ = lease
+        try:
+            for result in results:
+                self.sink.write(result)
+            self.scheduler.add(self._in_scope(links))
+            if self.checkpoint:
+                # Results must be on disk before the page counts as done.
+                self.sink.flush()
+                self.checkpoint.complete(url)
+        finally:
+            self.scheduler.done(url)
+        with self._lock:
+            self.pages += 1
+        logger.info(f"{worker} finished {url}: {len(results)} results, {len(links)} links")
+        return True
+
+    def _in_scope(self, links):
+        in_scope = []
+        for link in links:
+            if not isinstance(link, str):
+                continue
+            parts = urlparse(self.scheduler.normalize(link))
+            if parts.scheme in ("http", "https") and parts.netloc in self.hosts:
+                in_scope.append(link)
+        if len(in_scope) < len(links):
+            logger.debug(f"Dropped {len(links) - len(in_scope)} reported links outside the scan's hosts")
+        return in_scope
+
+    def reap(self):
+        """Hand out the URLs of expired leases again, or give up on them after too many attempts."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [(lease_id, lease) for lease_id, lease in self._leases.items() if lease[2] <= now]
+            for lease_id, _ in expired:
+                del self._leases[lease_id]
+        for lease_id, (url, worker, _) in expired:
+            if self._attempts.get(url, 0) >= self.max_attempts:
+                logger.error(f"Giving up on {url}: {self.max_attempts} leases expired, last held by {worker}")
+                if self.checkpoint:
+                    self.checkpoint.complete(url)
+                self.scheduler.done(url)
+            else:
+                logger.warning(f"Lease {lease_id} of {url} held by {worker} expired, handing it out again")
+                self.scheduler.requeue(url)
+
+    def serve(self, host="127.0.0.1", port=8765):
+        """Serve the worker API until the scan is finished."""
+        server = CoordinatorServer((host, port), self)
+        threading.Thread(target=server.serve_forever, name="scan-coordinator", daemon=True).start()
+        logger.info(f"Coordinator listening on http://{host}:{server.server_address[1]}")
+        try:
+            while not self.finished:
+                time.sleep(min(1.0, self.lease_timeout / 4))
+                self.reap()
+            time.sleep(FINISH_GRACE)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.sink.flush()
+        logger.info(f"Distributed scan finished: {self.pages} pages reported")
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON API of a ScanCoordinator: GET /scan, POST /lease, /renew and /complete."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/scan":
+            self._send(200, self.server.coordinator.info)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        coordinator = self.server.coordinator
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if self.path == "/lease":
+                self._send(200, coordinator.lease(body.get("worker") or self.client_address[0]))
+            elif self.path == "/renew":
+                self._send(200, {"renewed": coordinator.renew(body.get("leases", []))})
+            elif self.path == "/complete":
+                accepted = coordinator.complete(body["lease"], body.get("results", []), body.get("links", []))
+                self._send(200, {"accepted": accepted})
+            else:
+                self._send(404, {"error": "not found"})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"bad request: {e}"})
+
+    def _authorized(self):
+        token = self.server.coordinator.token
+        if token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode("utf-8"),
+                                             token.encode("utf-8")):
+            self._send(403, {"error": "bad token"})
+            return False
+        return True
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.client_address[0]} {format % args}")
+
+
+class CoordinatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, coordinator):
+        super().__init__(address, CoordinatorHandler)
+        self.coordinator = coordinator
+
+
+class ScanWorker:
+    """Leases URLs from a coordinator, probes them and reports the results back.
+
+    Runs ``threads`` lease loops plus one heartbeat thread renewing the
+    leases being probed. ``should_stop`` is checked between pages.
+    """
+
+    def __init__(self, coordinator_url, token=None, name=None, should_stop=None, timeout=LEASE_POLL + 30):
+        self.base_url = coordinator_url.rstrip("/")
+        if not self.base_url.startswith(("http://", "https://")):
+            self.base_url = f"http://{self.base_url}"
+        self.token = token
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.should_stop = should_stop or (lambda: False)
+        self.timeout = timeout
+        self.pages = 0
+        self._held = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stopped = threading.Event()
+
+    def scan_info(self):
+        """The scan's settings published by the coordinator (start_url, domain, lease_timeout)."""
+        return self._call("GET", "/scan")
+
+    def run(self, probe, threads=1):
+        """Probe leased URLs with ``probe(url) -> (results, links)`` until the coordinator is done."""
+        lease_timeout = self.scan_info().get("lease_timeout", LEASE_TIMEOUT)
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease_timeout / 3,), name="lease-heartbeat",
+                                     daemon=True)
+        heartbeat.start()
+        workers = [threading.Thread(target=self._work, args=(probe, f"{self.name}/{i}"), name=f"scan-worker-{i}",
+                                    daemon=True) for i in range(max(1, threads))]
+        try:
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                # Join with a timeout so the main thread keeps handling SIGINT.
+                while thread.is_alive():
+                    thread.join(0.5)
+        finally:
+            self._stopped.set()
+        logger.info(f"Worker {self.name} finished: {self.pages} pages probed")
+
+    def _work(self, probe, name):
+        while not self.should_stop():
+            try:
+                lease = self._call("POST", "/lease", {"worker": name})
+            except requests.RequestException as e:
+                logger.error(f"Giving up on coordinator {self.base_url}: {e}")
+                return
+            if lease.get("done"):
+                return
+            if "lease" not in lease:
+                time.sleep(lease.get("wait", 1))
+                continue
+            lease_id, url = lease["lease"], lease["url"]
+            with self._lock:
+                self._held.add(lease_id)
+            try:
+                results, links = probe(url)
+            except Exception as e:
+                logger.error(f"Worker failed on {url}: {e}")
+                results, links = [], []
+            with self._lock:
+                self._held.discard(lease_id)
+            try:
+                reply = self._call("POST", "/complete", {"lease": lease_id, "results": results, "links": links})
+            except requests.RequestException as e:
+                logger.error(f"Could not report {url} to the coordinator: {e}")
+                return
+            if reply.get("accepted"):
+                with self._lock:
+                    self.pages += 1
+            else:
+                logger.warning(f"Coordinator rejected the results of {url}: its lease had expired")
+
+    def _heartbeat(self, interval):
+        while not self._stopped.wait(interval):
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            try:
+                renewed = set(self._call("POST", "/renew", {"leases": held}).get("renewed", []))
+            except requests.RequestException as e:
+                logger.warning(f"Could not renew leases: {e}")
+                continue
+            for lease_id in set(held) - renewed:
+                logger.warning(f"Lease {lease_id} was lost; its results will be rejected")
+
+    def _call(self, method, path, payload=None):
+        """One JSON request to the coordinator, retried with backoff while it is unreachable."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            if self.token:
+                session.headers[TOKEN_HEADER] = self.token
+        for attempt in range(COORDINATOR_RETRIES):
+            try:
+                response = session.request(method, self.base_url + path, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == COORDINATOR_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
@@ -0,0 +1,159 @@
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledDriver:
+    """A WebDriver instance together with the proxy it was started with."""
+
+    def __init__(self, driver, proxy):
+        self.driver = driver
+        self.proxy = proxy
+        self.uses = 0
+
+
+class DriverPool:
+    """Bounded pool of reusable WebDriver instances.
+
+    Drivers are created lazily up to ``size``, leased out one at a time and
+    reset (cookies, storage, blank page) when they come back, so pages stay
+    isolated without paying Chrome startup for every URL. A driver is quit and
+    replaced after ``recycle_after`` pages, or as soon as it fails a health
+    check or a reset.
+    """
+
+    def __init__(self, factory, size=1, recycle_after=25, proxy_picker=None, proxy_release=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.recycle_after = recycle_after
+        self.proxy_picker = proxy_picker
+        self.proxy_release = proxy_release
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._leased = {}
+        self._closed = False
+
+    def acquire(self):
+        """Lease a healthy driver, creating one if no idle driver is available."""
+        self._slots.acquire()
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                break
+            if self._is_healthy(entry.driver):
+                break
+            logger.info(f"Discarding unhealthy driver (proxy {entry.proxy or 'none'})")
+            self._quit(entry)
+
+        if entry is None:
+            proxy = self.proxy_picker() if self.proxy_picker else None
+            driver = self.factory(proxy)
+            if not driver:
+                if self.proxy_release:
+                    self.proxy_release(proxy)
+                self._slots.release()
+                return None
+            entry = PooledDriver(driver, proxy)
+
+        with self._lock:
+            self._leased[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver, broken=False):
+        """Return a leased driver, recycling it when broken or worn out."""
+        with self._lock:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            return
+        try:
+            entry.uses += 1
+            if broken or self._closed or entry.uses >= self.recycle_after:
+                logger.debug(f"Recycling driver after {entry.uses} pages (broken={broken})")
+                self._quit(entry)
+            elif self._reset(entry.driver):
+                with self._lock:
+                    self._idle.append(entry)
+            else:
+                logger.info(f"Driver failed to reset, discarding (proxy {entry.proxy or 'none'})")
+                self._quit(entry)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        """Context manager around acquire/release; yields None if no driver could be created."""
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            if driver is not None:
+                self.release(driver, broken=broken)
+
+    def proxy_of(self, driver):
+        """Return the proxy a leased driver is bound to."""
+        with self._lock:
+            entry = self._leased.get(id(driver))
+        return entry.proxy if entry else None
+
+    def close(self):
+        """Quit every idle driver; drivers still leased are quit when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._quit(entry)
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """Clear cookies and storage of the current origin and park the driver on a blank page."""
+        try:
+            current = driver.current_url
+            if urlparse(current).scheme in ("http", "https"):
+                driver.execute_script(CLEAR_STORAGE_SCRIPT)
+                parsed = urlparse(current)
+                try:
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": f"{parsed.scheme}://{parsed.netloc}",
+                        "storageTypes": "all",
+                    })
+                except Exception:
+                    pass
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.debug(f"Driver reset failed: {e}")
+            return False
+
+    def _quit(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting driver: {e}")
+        if self.proxy_release:
+            self.proxy_release(entry.proxy)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FIELD_TAGS = ['input', 'textarea', 'select', 'button']
+
+
+def form_fingerprint(form, page_url):
+    """Fingerprint a <form> tag by action, method, field names/types and element structure.
+
+    Values, text and attribute order are ignored so the same form rendered on
+    many pages (login boxes, search bars, newsletter sign-ups) maps to one key.
+    """
+    action = urlsplit(urljoin(page_url, form.get('action') or page_url))
+    method = (form.get('method') or 'get').lower()
+    return _fingerprint(f"{action.netloc}{action.path}", method, form.find_all(FIELD_TAGS),
+                        [tag.name for tag in form.find_all(True)])
+
+
+def page_form_fingerprints(soup, page_url):
+    """Fingerprints of the forms on a page by their index in document.forms.
+
+    Inputs that sit outside any form get one fingerprint under index -1.
+    """
+    fingerprints = {index: form_fingerprint(form, page_url) for index, form in enumerate(soup.find_all('form'))}
+    loose = [tag for tag in soup.find_all(FIELD_TAGS) if not tag.find_parent('form')]
+    if loose:
+        fingerprints[-1] = _fingerprint("", "", loose, [tag.name for tag in loose])
+    return fingerprints
+
+
+def _fingerprint(action, method, fields, structure):
+    field_keys = sorted(f"{tag.name}:{(tag.get('type') or '').lower()}:{tag.get('name') or ''}" for tag in fields)
+    material = "|".join([action, method, ",".join(field_keys), ",".join(structure)])
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+class FormCache:
+    """Index of form fingerprints already probed, in this scan or a previous one.
+
+    Entries loaded from ``path`` count as known until they are older than
+    ``ttl`` seconds. ``claim`` is atomic, so when several workers meet the same
+    form at once only one of them runs the full payload set. A claim is only a
+    reservation in memory: the form counts as tested (and is saved) once
+    ``complete`` is called after its probe produced verdicts, and ``release``
+    hands it back when the probe failed.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tested = {}
+        self._reserved = set()
+        self.hits = 0
+        if path:
+            self._load()
+
+    def claim(self, fingerprint, test_name):
+        """Return True if the form still needs a full probe for this test, reserving it for the caller."""
+        key = f"{test_name}:{fingerprint}"
+        with self._lock:
+            tested_at = self._tested.get(key)
+            if (tested_at is not None and time.time() - tested_at < self.ttl) or key in self._reserved:
+                self.hits += 1
+                return False
+            self._reserved.add(key)
+            return True
+
+    def complete(self, fingerprint, test_name):
+        """Record a claimed form as tested."""
+        key = f"{test_name}:{fingerprint}"
+        with self._lock:
+            self._reserved.discard(key)
+            self._tested[key] = time.time()
+
+    def release(self, fingerprint, test_name):
+        """Give up a claim whose probe produced no verdicts, so the form gets a full probe next time."""
+        with self._lock:
+            self._reserved.discard(f"{test_name}:{fingerprint}")
+
+    def settle(self, fingerprint, test_name, tested):
+        """``complete`` a claim if ``tested``, ``release`` it otherwise."""
+        if tested:
+            self.complete(fingerprint, test_name)
+        else:
+            self.release(fingerprint, test_name)
+
+    def save(self):
+        """Write fresh entries back to disk."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {fp: ts for fp, ts in self._tested.items() if now - ts < self.ttl}
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Saved {len(entries)} form fingerprints to {self.path} ({self.hits} repeat forms skipped)")
+        except OSError as e:
+            logger.error(f"Failed to save form cache {self.path}: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable form cache {self.path}: {e}")
+            return
+        now = time.time()
+        self._tested = {fp: ts for fp, ts in entries.items() if now - ts < self.ttl}
+        logger.info(f"Loaded {len(self._tested)} form fingerprints from {self.path}")
@@ -0,0 +1,237 @@
+import logging
+import threading
+from itertools import islice
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from formCache import form_fingerprint
+from responseDetector import PageSnapshot
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Field types that receive payloads; everything else keeps its default value.
+INJECTABLE_TYPES = {"text", "search", "email", "password", "url", "tel", "textarea"}
+
+# Harmless value submitted once per form to capture its baseline response
+BASELINE_VALUE = "formprober7531"
+
+# Markup that means forms are rendered or submitted by client-side JavaScript.
+SPA_MARKERS = ("<app-root", "ng-version", "data-reactroot", "__NEXT_DATA__", "data-v-app", "id=\"__nuxt\"")
+
+
+class StaticPage:
+    """A page fetched over plain HTTP together with what was parsed from it."""
+
+    def __init__(self, url, final_url, html, soup):
+        self.url = url
+        self.final_url = final_url
+        self.html = html
+        self.soup = soup
+        self.forms = parse_forms(soup, final_url) if soup is not None else []
+        self.browser_reason = needs_browser(html, soup, self.forms) if soup is not None else None
+        self.baselines = {}
+
+    def links(self):
+        if self.soup is None:
+            return []
+        return [urljoin(self.final_url, a['href']) for a in self.soup.find_all('a', href=True)]
+
+
+def parse_forms(soup, base_url):
+    """Extract action, method and fields (including hidden tokens) of every form on the page."""
+    forms = []
+    for form in soup.find_all('form'):
+        fields = []
+        for element in form.find_all(['input', 'textarea', 'select', 'button']):
+            name = element.get('name')
+            if not name:
+                continue
+            if element.name == 'textarea':
+                fields.append({"name": name, "type": "textarea", "value": element.get_text()})
+            elif element.name == 'select':
+                option = element.find('option', selected=True) or element.find('option')
+                value = option.get('value', option.get_text()) if option else ""
+                fields.append({"name": name, "type": "select", "value": value})
+            elif element.name == 'button':
+                if element.get('type', 'submit').lower() == 'submit':
+                    fields.append({"name": name, "type": "submit", "value": element.get('value', '')})
+            else:
+                field_type = (element.get('type') or 'text').lower()
+                if field_type in ('checkbox', 'radio') and not element.has_attr('checked'):
+                    continue
+                fields.append({"name": name, "type": field_type, "value": element.get('value', '')})
+        forms.append({
+            "action": urljoin(base_url, form.get('action') or base_url),
+            "method": (form.get('method') or 'get').lower(),
+            "fields": fields,
+            "onsubmit": form.has_attr('onsubmit'),
+            "fingerprint": form_fingerprint(form, base_url),
+        })
+    return forms
+
+
+def needs_browser(html, soup, forms):
+    """Return why a page has to be rendered in a browser, or None if plain HTTP is enough."""
+    if any(marker in html for marker in SPA_MARKERS):
+        return "single-page app markup"
+    if any(form["onsubmit"] or form["action"].startswith("javascript:") for form in forms):
+        return "form submitted by JavaScript"
+    loose_inputs = [i for i in soup.find_all(['input', 'textarea']) if not i.find_parent('form')]
+    if loose_inputs:
+        return "inputs outside of a form"
+    if forms and not any(f["type"] in INJECTABLE_TYPES for form in forms for f in form["fields"]):
+        return "form without named text fields"
+    return None
+
+
+class HttpProber:
+    """Fetches pages and submits form payloads over plain HTTP with pooled keep-alive sessions."""
+
+    def __init__(self, proxy_picker=None, timeout=10, pool_size=10):
+        self.proxy_picker = proxy_picker
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """Per-thread session, bound to one proxy for its lifetime."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            proxy = self.proxy_picker() if self.proxy_picker else None
+            if proxy:
+                session.proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+            self._local.session = session
+        return session
+
+    def fetch(self, url):
+        """Fetch a page; returns a StaticPage or None if the request failed."""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug(f"HTTP fetch of {url} failed: {e}")
+            return None
+        if "html" not in response.headers.get("Content-Type", "html"):
+            return StaticPage(url, response.url, "", None)
+        return StaticPage(url, response.url, response.text, BeautifulSoup(response.text, 'lxml'))
+
+    def submit(self, form, payload, field=None):
+        """Submit a form with the payload in ``field``, or in every injectable field when None.
+
+        Returns (response body, seconds until the response arrived).
+        """
+        data = {}
+        for f in form["fields"]:
+            injected = f is field if field is not None else f["type"] in INJECTABLE_TYPES
+            data[f["name"]] = payload if injected else f["value"]
+        if form["method"] == "post":
+            response = self.session.post(form["action"], data=data, timeout=self.timeout)
+        else:
+            response = self.session.get(form["action"], params=data, timeout=self.timeout)
+        return response.text, response.elapsed.total_seconds()
+
+    def probe(self, page, test_name, payloads, detect, form_cache=None, spot_check=1):
+        """Submit every payload through every injectable field of every form on the page.
+
+        ``payloads`` is a list, or a callable ``payloads(fields, baseline)``
+        picking them per form from its injectable fields and baseline.
+        ``detect(payload, snapshot, baseline)`` judges a single response
+        against the form's response to a harmless value, both given as
+        PageSnapshots, and returns the evidence found (empty if none).
+        Like BrowserProber, one result is reported per form and payload,
+        listing the fields that turned out vulnerable. Forms already claimed
+        in ``form_cache`` only get the first ``spot_check`` payloads, or are
+        skipped when that is 0; a form claimed here is recorded as tested
+        once it produced verdicts.
+        """
+        if not page.forms:
+            logger.info(f"No forms found on {page.url}, skipping {test_name} test.")
+            return [{
+                "url": page.url,
+                "payload": "N/A",
+                "vulnerable": False,
+                "status": "No Inputs",
+                "response_snippet": "",
+                "console_logs": []
+            }]
+
+        results = []
+        for index, form in enumerate(page.forms):
+            fields = [field for field in form["fields"] if field["type"] in INJECTABLE_TYPES]
+            if not fields:
+                continue
+            limit, claimed = None, False
+            if form_cache:
+                claimed = form_cache.claim(form["fingerprint"], test_name)
+                if not claimed:
+                    limit = spot_check
+                    if limit <= 0:
+                        logger.info(f"Skipping {test_name} test of known form {form['action']} on {page.url}")
+                        continue
+            form_results = []
+            try:
+                form_results = self._probe_form(page, index, form, fields, payloads, detect, limit)
+            finally:
+                if claimed:
+                    # Only a probe that produced verdicts makes the form count as tested.
+                    form_cache.settle(form["fingerprint"], test_name, bool(form_results))
+            results.extend(form_results)
+        return results
+
+    def _probe_form(self, page, index, form, fields, payloads, detect, limit):
+        baseline = self._baseline(page, index, form)
+        form_payloads = payloads(fields, baseline) if callable(payloads) else payloads
+        results = []
+        for payload in islice(form_payloads, limit):
+            vulnerable_fields, evidence, reported = [], set(), None
+            for field in fields:
+                try:
+                    response_text, elapsed = self.submit(form, payload, field)
+                except requests.RequestException as e:
+                    logger.warning(f"Failed to submit payload to {form['action']}: {e}")
+                    continue
+                snapshot = PageSnapshot(response_text)
+                found = detect(payload, snapshot, baseline)
+                if found:
+                    vulnerable_fields.append(field["name"])
+                    evidence |= set(found)
+                if reported is None or (found and not reported[0]):
+                    reported = (bool(found), response_text, elapsed)
+            if reported is None:
+                continue
+            vulnerable, response_text, elapsed = reported
+            result_status = "Vulnerable" if vulnerable else "Not Vulnerable"
+            logger.info(f"Tested {page.url} ({form['method'].upper()} {urlparse(form['action']).path}) "
+                        f"over HTTP with payload {payload}: {result_status}"
+                        + (f" via {', '.join(vulnerable_fields)}" if vulnerable_fields else ""))
+            results.append({
+                "url": page.url,
+                "form": form["action"],
+                "payload": payload,
+                "vulnerable": vulnerable,
+                "status": result_status,
+                "vulnerable_fields": vulnerable_fields,
+                "evidence": sorted(evidence),
+                "response_snippet": response_text[:200],
+                "console_logs": [],
+                "settle_time": round(elapsed, 3)
+            })
+        return results
+
+    def _baseline(self, page, index, form):
+        """The form's response to a harmless value, fetched once per page and shared by all tests."""
+        if index not in page.baselines:
+            try:
+                page.baselines[index] = PageSnapshot(self.submit(form, BASELINE_VALUE)[0])
+            except requests.RequestException as e:
+                logger.debug(f"Baseline submission to {form['action']} failed: {e}")
+                page.baselines[index] = None
+        return page.baselines[index]
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from urllib.parse import urljoin, urldefrag, urlsplit, urlunsplit, parse_qsl, urlencode
+import aiohttp
+import lxml.html
+from asyncThread import start_async_thread
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Canonicalize a URL so equivalent spellings dedup to one frontier entry.
+
+    Lowercases scheme and host, drops default ports, collapses duplicate and
+    trailing slashes, sorts query parameters and drops plain #anchors. Hash
+    routes (#/path or #!/path) are kept since single-page apps use them as
+    distinct pages. The result is meant as a dedup key: dropping the
+    trailing slash changes what relative links resolve against, so pages
+    are fetched by their original URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!/")) else ""
+    return urlunsplit((scheme, host, path, query, fragment))
+
+
+class LinkDiscovery:
+    """Asyncio link crawler that runs ahead of the probing stage.
+
+    Fetches pages over one pooled keep-alive aiohttp session, extracts links
+    with lxml and hands every new in-scope URL to ``on_url``. The frontier is
+    a FIFO queue (breadth first) deduplicated on normalized URLs; URLs are
+    fetched and handed on as found.
+    """
+
+    def __init__(self, start_urls, allowed_hosts, on_url, max_urls=10000, concurrency=50,
+                 timeout=10, proxy_picker=None, should_stop=None):
+        self.start_urls = list(start_urls)
+        self.allowed_hosts = set(allowed_hosts)
+        self.on_url = on_url
+        self.max_urls = max_urls
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.proxy_picker = proxy_picker
+        self.should_stop = should_stop or (lambda: False)
+        self.seen = set()
+        self.fetched = 0
+
+    def start_in_thread(self, on_finished=None):
+        """Run the discovery loop on its own event loop in a daemon thread."""
+        return start_async_thread(self.run, "link-discovery", "Link discovery", on_finished)
+
+    async def run(self):
+        queue = asyncio.Queue()
+        for url in self.start_urls:
+            self._enqueue(queue, url)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as session:
+            workers = [asyncio.create_task(self._worker(session, queue)) for _ in range(self.concurrency)]
+            try:
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(f"Link discovery finished: {len(self.seen)} URLs found, {self.fetched} pages fetched")
+
+    async def _worker(self, session, queue):
+        while True:
+            url = await queue.get()
+            try:
+                if not self.should_stop():
+                    for link in await self._fetch_links(session, url):
+                        self._enqueue(queue, link)
+            except Exception as e:
+                logger.debug(f"Discovery fetch of {url} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _fetch_links(self, session, url):
+        proxy = self.proxy_picker() if self.proxy_picker else None
+        async with session.get(url, proxy=f"http://{proxy}" if proxy else None) as response:
+            if "html" not in response.headers.get("Content-Type", ""):
+                return []
+            body = await response.read()
+            base = str(response.url)
+        self.fetched += 1
+        if not body.strip():
+            return []
+        document = lxml.html.fromstring(body)
+        return [urljoin(base, href) for href in document.xpath("//a/@href")]
+
+    def _enqueue(self, queue, url):
+        if len(self.seen) >= self.max_urls or self.should_stop():
+            return
+        key = normalize_url(url)
+        parts = urlsplit(key)
+        if parts.scheme not in ("http", "https") or parts.netloc not in self.allowed_hosts:
+            return
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self.on_url(url)
+        if parts.fragment:
+            # Hash routes share the server-side document of their base URL.
+            self._enqueue(queue, urldefrag(url).url)
+        else:
+            queue.put_nowait(urldefrag(url).url)
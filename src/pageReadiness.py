@@ -0,0 +1,138 @@
+import json
+import logging
+import time
+from selenium.common.exceptions import NoAlertPresentException, UnexpectedAlertPresentException
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.05
+MAX_ALERTS = 20  # Dialogs accepted in a row before giving up on a page that keeps opening them
+
+# Records the time of the last DOM mutation in window.__formProberLastMutation.
+INSTALL_MUTATION_OBSERVER = """
+if (!window.__formProberObserver) {
+    window.__formProberLastMutation = performance.now();
+    window.__formProberObserver = new MutationObserver(function () {
+        window.__formProberLastMutation = performance.now();
+    });
+    window.__formProberObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+"""
+
+# Milliseconds since the last DOM mutation, or null when the observer is gone
+# (i.e. the page navigated) and the new document is still loading.
+DOM_QUIET_FOR = """
+if (window.__formProberLastMutation === undefined) {
+    return document.readyState === 'complete' ? 1e9 : null;
+}
+return performance.now() - window.__formProberLastMutation;
+"""
+
+NETWORK_START = "Network.requestWillBeSent"
+NETWORK_END = ("Network.loadingFinished", "Network.loadingFailed")
+
+
+def prepare_settle_wait(driver):
+    """Arm the readiness signals before an action; returns the URL to detect navigation against."""
+    try:
+        driver.execute_script(INSTALL_MUTATION_OBSERVER)
+    except Exception as e:
+        logger.debug(f"Could not install mutation observer: {e}")
+    _drain_performance_log(driver)
+    return driver.current_url
+
+
+def wait_for_settle(driver, start_url, timeout=10.0, quiet=0.15):
+    """Wait until the page has settled after an action.
+
+    Returns early on an alert dialog. Otherwise the page is considered settled
+    once no network request has been in flight and no DOM mutation has happened
+    for ``quiet`` seconds; a URL change additionally waits for the new document
+    to finish loading. Gives up after ``timeout`` seconds.
+
+    Returns (elapsed seconds, reason) where reason is one of "alert",
+    "navigation", "quiet" or "timeout".
+    """
+    start = time.monotonic()
+    in_flight = set()
+    network_quiet_since = start
+    navigated = False
+
+    while True:
+        now = time.monotonic()
+        elapsed = now - start
+        if _alert_present(driver):
+            return elapsed, "alert"
+        if elapsed >= timeout:
+            return elapsed, "timeout"
+
+        try:
+            if not navigated and driver.current_url != start_url:
+                navigated = True
+            events = _drain_performance_log(driver)
+            for method, request_id in events:
+                if method == NETWORK_START:
+                    in_flight.add(request_id)
+                elif method in NETWORK_END:
+                    in_flight.discard(request_id)
+            if events or in_flight:
+                network_quiet_since = now
+            dom_quiet_ms = driver.execute_script(DOM_QUIET_FOR)
+        except UnexpectedAlertPresentException:
+            return time.monotonic() - start, "alert"
+
+        network_idle = not in_flight and now - network_quiet_since >= quiet
+        dom_idle = dom_quiet_ms is not None and dom_quiet_ms >= quiet * 1000
+        if network_idle and dom_idle and elapsed >= quiet:
+            return elapsed, "navigation" if navigated else "quiet"
+        time.sleep(POLL_INTERVAL)
+
+
+def dismiss_alert(driver, limit=MAX_ALERTS):
+    """Accept open alert dialogs until none is left; returns the first one's text, or None if there was none.
+
+    A payload reflected twice opens a dialog per reflection, and one left
+    open makes every further WebDriver call fail.
+    """
+    first_text = None
+    for _ in range(limit):
+        try:
+            alert = driver.switch_to.alert
+            text = alert.text
+            alert.accept()
+        except NoAlertPresentException:
+            break
+        if first_text is None:
+            first_text = text
+    return first_text
+
+
+def _alert_present(driver):
+    try:
+        driver.switch_to.alert
+        return True
+    except NoAlertPresentException:
+        return False
+
+
+def _drain_performance_log(driver):
+    """Return (method, requestId) pairs for network events logged since the last drain."""
+    try:
+        entries = driver.get_log("performance")
+    except UnexpectedAlertPresentException:
+        raise
+    except Exception:
+        # Performance logging not enabled; treat the network as idle.
+        return []
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method", "")
+        if method == NETWORK_START or method in NETWORK_END:
+            events.append((method, message.get("params", {}).get("requestId")))
+    return events
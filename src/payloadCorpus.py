@@ -0,0 +1,132 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Path words that name the test a payload file belongs to when it has no "# test:" line
+TEST_NAMES = {"xss": "XSS", "sqli": "SQL", "sql": "SQL"}
+
+PAYLOAD_FILE_SUFFIXES = (".txt", ".lst")
+
+
+class PayloadCorpus:
+    """Payloads per test, from built-in lists plus payload files streamed on demand.
+
+    A payload file holds one payload per line. Lines starting with "# " are
+    comments, except for two directives: "# test: xss" before the first
+    payload names the test of the whole file (otherwise it is taken from its
+    path below the added directory, e.g. xss/attribute.txt when adding
+    payloads/, or from the name of a file added on its own), and
+    "# tags: attribute, script"
+    tags every payload after it up to the next tags line. Files are only read
+    while payloads are selected, so a corpus of any size costs no memory up
+    front.
+    """
+
+    def __init__(self, builtin=None):
+        self.builtin = {test.upper(): list(payloads) for test, payloads in (builtin or {}).items()}
+        self.files = []
+
+    def add(self, path):
+        """Add a payload file, or every payload file below a directory; returns the number of files added."""
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(root, name) for root, _, names in os.walk(path)
+                           for name in names if name.endswith(PAYLOAD_FILE_SUFFIXES))
+            # Directories above the added one (e.g. a home directory) say nothing about the test.
+            self.files.extend((file, _test_from_path(os.path.relpath(file, path))) for file in paths)
+        elif os.path.isfile(path):
+            paths = [path]
+            self.files.append((path, _test_from_path(os.path.basename(path))))
+        else:
+            raise FileNotFoundError(f"Payload file or directory {path} not found")
+        return len(paths)
+
+    def select(self, test, contexts=None, limit=None):
+        """Yield distinct payloads of a test that fit one of ``contexts``, at most ``limit`` of them.
+
+        Untagged payloads fit every context; tagged ones only a context
+        among their tags. Without ``contexts`` every payload is yielded.
+        """
+        test, seen = test.upper(), set()
+        if limit is not None and limit <= 0:
+            return
+        for payload, tags in self._iter_test(test):
+            if payload in seen or (contexts is not None and tags and not tags & contexts):
+                continue
+            seen.add(payload)
+            yield payload
+            if limit is not None and len(seen) >= limit:
+                return
+
+    def _iter_test(self, test):
+        for payload in self.builtin.get(test, ()):
+            yield payload, frozenset()
+        for path, path_test in self.files:
+            yield from self._iter_file(path, path_test, test)
+
+    @staticmethod
+    def _iter_file(path, path_test, test):
+        file_test, tags = path_test, frozenset()
+        try:
+            with open(path, encoding="utf-8", errors="replace") as file:
+                for line in file:
+                    line = line.rstrip("\r\n")
+                    if line == "#" or line.startswith("# "):
+                        key, _, value = line[2:].partition(":")
+                        key = key.strip().lower()
+                        if key == "test":
+                            file_test = TEST_NAMES.get(value.strip().lower(), value.strip().upper())
+                        elif key == "tags":
+                            tags = frozenset(tag.strip().lower() for tag in value.split(",") if tag.strip())
+                        continue
+                    if file_test is None:
+                        logger.warning(f"Skipping payload file {path}: no '# test:' line and no test in its path")
+                        return
+                    if file_test != test:
+                        return
+                    if line:
+                        yield line, tags
+        except OSError as e:
+            logger.warning(f"Could not read payload file {path}: {e}")
+
+
+def _test_from_path(path):
+    """The test named by a payload file's relative path, or None."""
+    for part in reversed(os.path.normpath(path).lower().split(os.sep)):
+        for word, test in TEST_NAMES.items():
+            if word in part:
+                return test
+    return None
+
+
+def reflection_contexts(source, canary):
+    """Where a canary value shows up in an HTML response.
+
+    Returns a subset of {"html", "attribute", "script", "comment"}, or
+    {"none"} when it is not reflected at all.
+    """
+    source, canary = source.lower(), canary.lower()
+    contexts = set()
+    start = source.find(canary)
+    while start != -1:
+        script = source.rfind("<script", 0, start)
+        if script > source.rfind("</script", 0, start) and source.find(">", script, start) != -1:
+            contexts.add("script")
+        elif source.rfind("<!--", 0, start) > source.rfind("-->", 0, start):
+            contexts.add("comment")
+        elif source.rfind("<", 0, start) > source.rfind(">", 0, start):
+            contexts.add("attribute")
+        else:
+            contexts.add("html")
+        start = source.find(canary, start + len(canary))
+    return contexts or {"none"}
+
+
+def field_contexts(fields):
+    """Contexts given by injectable fields: their types, and "numeric" or "string" by their default value."""
+    contexts = set()
+    for field in fields:
+        contexts.add(field.get("type") or "text")
+        value = field.get("value") or ""
+        contexts.add("numeric" if value.strip().lstrip("-").isdigit() else "string")
+    return contexts
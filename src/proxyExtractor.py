@@ -0,0 +1,117 @@
+import re
+
+# One octet 0-255 and one port 1-65535, both without leading zeros, so every
+# match is already a valid proxy and needs no per-candidate checks.
+_OCTET = rb"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_PORT = rb"(?:6553[0-5]|655[0-2]\d|65[0-4]\d\d|6[0-4]\d{3}|[1-5]\d{4}|[1-9]\d{0,3})"
+PROXY_PATTERN = re.compile(
+    rb"(?<![\w.])" + _OCTET + rb"\." + _OCTET + rb"\." + _OCTET + rb"\." + _OCTET + rb":" + _PORT + rb"(?!\w)"
+)
+
+# The last byte that can never be part of a match or its look-around
+# context; a safe place to split a stream.
+_LAST_SEPARATOR = re.compile(rb"[^\w.:](?=[\w.:]*\Z)")
+_SEPARATOR_WINDOW = 4096
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def pack_proxy(proxy):
+    """Pack an ip:port match (bytes) into one 48-bit int."""
+    ip, port = proxy.split(b":")
+    a, b, c, d = ip.split(b".")
+    return (int(a) << 40) | (int(b) << 32) | (int(c) << 24) | (int(d) << 16) | int(port)
+
+
+def unpack_proxy(packed):
+    """Turn a packed proxy back into its ip:port string."""
+    return (f"{packed >> 40 & 0xFF}.{packed >> 32 & 0xFF}.{packed >> 24 & 0xFF}."
+            f"{packed >> 16 & 0xFF}:{packed & 0xFFFF}")
+
+
+class ProxySet:
+    """Insertion-ordered set of proxies stored as packed ints instead of strings."""
+
+    def __init__(self):
+        self._packed = {}
+
+    def add(self, packed):
+        """Add a packed proxy; returns True if it was not in the set yet."""
+        if packed in self._packed:
+            return False
+        self._packed[packed] = None
+        return True
+
+    def __contains__(self, proxy):
+        if isinstance(proxy, str):
+            proxy = proxy.encode("ascii", "ignore")
+            return bool(PROXY_PATTERN.fullmatch(proxy)) and pack_proxy(proxy) in self._packed
+        return proxy in self._packed
+
+    def __len__(self):
+        return len(self._packed)
+
+    def __iter__(self):
+        return map(unpack_proxy, self._packed)
+
+    def packed(self):
+        return iter(self._packed)
+
+
+def iter_packed(data, pos=0, endpos=None):
+    """Yield each distinct proxy in a bytes buffer once, packed, in order of first appearance.
+
+    Matching and deduplication both run in C (findall + dict.fromkeys); only
+    distinct matches are converted, which is what keeps multi-megabyte lists
+    with heavy repetition cheap.
+    """
+    if endpos is None:
+        endpos = len(data)
+    for match in dict.fromkeys(PROXY_PATTERN.findall(data, pos, endpos)):
+        yield pack_proxy(match)
+
+
+def extract_proxies(text, proxy_set=None):
+    """Return the unique proxies in a str or bytes document, in order of first appearance.
+
+    Pass a ProxySet to deduplicate across documents; only proxies new to it
+    are returned.
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8", "ignore")
+    proxy_set = proxy_set if proxy_set is not None else ProxySet()
+    return [unpack_proxy(packed) for packed in iter_packed(text) if proxy_set.add(packed)]
+
+
+def iter_stream(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield packed proxies from a binary stream read in chunks.
+
+    Each buffer is scanned up to its last separator byte; the remainder,
+    starting at that separator so look-behind still sees it, is carried into
+    the next round. Each proxy is yielded once, on first appearance, with
+    duplicates tracked as packed ints.
+    """
+    seen = ProxySet()
+    carry = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer = carry + chunk
+        if not chunk:
+            yield from (packed for packed in iter_packed(buffer) if seen.add(packed))
+            return
+        separator = _LAST_SEPARATOR.search(buffer, max(0, len(buffer) - _SEPARATOR_WINDOW))
+        if separator is None:
+            # No safe split point near the end; carry the whole buffer over.
+            carry = buffer
+            continue
+        cut = separator.start()
+        yield from (packed for packed in iter_packed(buffer, 0, cut) if seen.add(packed))
+        carry = buffer[cut:]
+
+
+def extract_from_stream(stream, chunk_size=DEFAULT_CHUNK_SIZE, proxy_set=None):
+    """Collect the unique proxies of a binary stream into a ProxySet."""
+    proxy_set = proxy_set if proxy_set is not None else ProxySet()
+    for packed in iter_stream(stream, chunk_size):
+        proxy_set.add(packed)
+    return proxy_set
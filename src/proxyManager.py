@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyStats:
+    """Running health record of one proxy."""
+
+    FIELDS = ("successes", "failures", "latency", "last_failure", "consecutive_failures", "quarantined_until")
+
+    def __init__(self, successes=0, failures=0, latency=None, last_failure=None,
+                 consecutive_failures=0, quarantined_until=0.0):
+        self.successes = successes
+        self.failures = failures
+        self.latency = latency  # EWMA of page load time in seconds
+        self.last_failure = last_failure
+        self.consecutive_failures = consecutive_failures
+        self.quarantined_until = quarantined_until
+        self.in_use = 0
+
+    @property
+    def success_rate(self):
+        total = self.successes + self.failures
+        return self.successes / total if total else 1.0
+
+    def to_dict(self):
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "latency": self.latency,
+            "last_failure": self.last_failure,
+            "consecutive_failures": self.consecutive_failures,
+            "quarantined_until": self.quarantined_until,
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        """Stats saved by to_dict; keys of other versions are ignored."""
+        if not isinstance(values, dict):
+            raise TypeError(f"expected an object, got {type(values).__name__}")
+        stats = cls(**{key: values[key] for key in cls.FIELDS if key in values})
+        if not all(isinstance(getattr(stats, key), (int, float, type(None))) for key in cls.FIELDS):
+            raise ValueError("non-numeric value")
+        return stats
+
+
+class ProxyManager:
+    """Latency- and health-aware proxy selection.
+
+    Tracks success rate, an EWMA of load latency and the last failure per
+    proxy. A failing proxy is quarantined for ``base_quarantine`` seconds,
+    doubling with every consecutive failure up to ``max_quarantine``.
+    ``pick`` returns the healthy proxy with the best expected latency,
+    spreading load across proxies already bound to running browsers. Stats
+    are persisted to ``stats_path`` so the next run starts warm.
+    """
+
+    def __init__(self, proxies, stats_path=None, alpha=0.3, base_quarantine=30, max_quarantine=3600,
+                 default_latency=5.0):
+        self.stats_path = stats_path
+        self.alpha = alpha
+        self.base_quarantine = base_quarantine
+        self.max_quarantine = max_quarantine
+        self.default_latency = default_latency
+        self._lock = threading.Lock()
+        self._stats = {proxy: ProxyStats() for proxy in proxies}
+        if stats_path:
+            self._load()
+
+    def pick(self, bind=True):
+        """Return the best currently usable proxy, or None if there are none.
+
+        With ``bind`` the proxy counts as in use until ``release`` is called.
+        """
+        with self._lock:
+            if not self._stats:
+                return None
+            now = time.time()
+            healthy = [p for p, s in self._stats.items() if s.quarantined_until <= now]
+            if healthy:
+                proxy = min(healthy, key=self._score)
+            else:
+                proxy = min(self._stats, key=lambda p: self._stats[p].quarantined_until)
+                logger.warning(f"All proxies quarantined, using {proxy} whose quarantine ends first")
+            if bind:
+                self._stats[proxy].in_use += 1
+            return proxy
+
+    def release(self, proxy):
+        """A browser bound to the proxy has been shut down."""
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats and stats.in_use > 0:
+                stats.in_use -= 1
+
+    def report_success(self, proxy, latency):
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if not stats:
+                return
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.latency = latency if stats.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.latency)
+
+    def report_failure(self, proxy):
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if not stats:
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_failure = time.time()
+            backoff = min(self.base_quarantine * 2 ** (stats.consecutive_failures - 1), self.max_quarantine)
+            stats.quarantined_until = stats.last_failure + backoff
+            logger.info(f"Quarantining proxy {proxy} for {backoff:.0f}s after "
+                        f"{stats.consecutive_failures} consecutive failure(s)")
+
+    def save(self):
+        if not self.stats_path:
+            return
+        with self._lock:
+            data = {proxy: stats.to_dict() for proxy, stats in self._stats.items()}
+        try:
+            tmp_path = f"{self.stats_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.stats_path)
+            logger.info(f"Saved stats for {len(data)} proxies to {self.stats_path}")
+        except OSError as e:
+            logger.error(f"Failed to save proxy stats {self.stats_path}: {e}")
+
+    def _score(self, proxy):
+        stats = self._stats[proxy]
+        latency = stats.latency if stats.latency is not None else self.default_latency
+        return latency / max(stats.success_rate, 0.05) * (1 + stats.in_use)
+
+    def _load(self):
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable proxy stats {self.stats_path}: {e}")
+            return
+        if not isinstance(data, dict):
+            logger.warning(f"Ignoring proxy stats {self.stats_path}: not a JSON object")
+            return
+        loaded = 0
+        for proxy, values in data.items():
+            if proxy in self._stats:
+                try:
+                    self._stats[proxy] = ProxyStats.from_dict(values)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Skipping malformed stats of proxy {proxy}: {e}")
+                    continue
+                loaded += 1
+        logger.info(f"Loaded stats for {loaded} proxies from {self.stats_path}")
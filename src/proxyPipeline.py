@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from proxyExtractor import ProxySet, pack_proxy
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyPipeline:
+    """Deduplicates harvested proxies and validates them while harvesting goes on.
+
+    ``submit`` may be called from any harvest thread; proxies not seen
+    before in this run (kept packed in a ProxySet) go straight onto the
+    queue of an asyncio loop in a background thread, where ``concurrency``
+    consumers test them with ``check(session, proxy)``, an async function
+    returning the latency in seconds or None. ``session_factory()`` returns
+    the async context manager (e.g. an aiohttp.ClientSession) passed to it.
+    Every working proxy is handed to ``on_valid(proxy, latency)`` as soon
+    as it is found. ``close`` waits for the queue to drain.
+    """
+
+    def __init__(self, check, session_factory, concurrency=1000, on_valid=None):
+        self.check = check
+        self.session_factory = session_factory
+        self.concurrency = max(1, concurrency)
+        self.on_valid = on_valid
+        self.latencies = {}
+        self.tested = 0
+        self.first_valid_after = None  # Seconds from start() to the first working proxy
+        self._seen = ProxySet()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._started = None
+
+    def __len__(self):
+        """Number of distinct proxies submitted so far."""
+        with self._lock:
+            return len(self._seen)
+
+    def start(self):
+        """Start the validation loop; returns the pipeline."""
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), name="proxy-validation",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def submit(self, proxies):
+        """Queue the proxies not seen before for validation; returns how many were new."""
+        new = []
+        with self._lock:
+            for proxy in proxies:
+                if self._seen.add(pack_proxy(proxy.encode("ascii"))):
+                    new.append(proxy)
+        if new:
+            self._loop.call_soon_threadsafe(self._enqueue, new)
+        return len(new)
+
+    def close(self):
+        """Wait until every submitted proxy has been tested; returns {proxy: latency} of the working ones."""
+        # The stop markers queue up behind everything submitted so far.
+        self._loop.call_soon_threadsafe(self._enqueue, [None] * self.concurrency)
+        self._thread.join()
+        return self.latencies
+
+    def _enqueue(self, proxies):
+        for proxy in proxies:
+            self._queue.put_nowait(proxy)
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        async with self.session_factory() as session:
+            await asyncio.gather(*(self._consume(session) for _ in range(self.concurrency)))
+
+    async def _consume(self, session):
+        while True:
+            proxy = await self._queue.get()
+            if proxy is None:
+                return
+            try:
+                latency = await self.check(session, proxy)
+            except Exception as e:
+                logger.debug("Proxy %s check failed: %s", proxy, e)
+                latency = None
+            self.tested += 1
+            if latency is None:
+                continue
+            if not self.latencies:
+                self.first_valid_after = time.monotonic() - self._started
+                logger.info("First working proxy %s after %.1fs", proxy, self.first_valid_after)
+            self.latencies[proxy] = latency
+            if self.on_valid:
+                self.on_valid(proxy, latency)
+
+
+class ProxyFileWriter:
+    """The one thread writing the harvest records and the proxy list.
+
+    Any thread may queue a harvest record (a JSON line of ``records_path``)
+    or a working proxy (a line of ``list_path``); the writer keeps both
+    files open and writes whatever has queued up in one batch. The proxy
+    list is only truncated once the first working proxy of the run arrives,
+    so a run that finds none leaves the previous list in place. ``close``
+    rewrites it in the final (fastest first) order.
+    """
+
+    def __init__(self, records_path, list_path):
+        self.records_path = records_path
+        self.list_path = list_path
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="proxy-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def record(self, data):
+        """Queue a harvest record for the records file."""
+        self._queue.put((self.records_path, json.dumps(data)))
+
+    def add_proxy(self, proxy):
+        """Queue a working proxy for the proxy list."""
+        self._queue.put((self.list_path, proxy))
+
+    def close(self, ranked=None):
+        """Write what is still queued, then replace the proxy list with ``ranked`` if given."""
+        self._queue.put(None)
+        self._thread.join()
+        if ranked:
+            temp_path = f"{self.list_path}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write("".join(f"{proxy}\n" for proxy in ranked))
+                os.replace(temp_path, self.list_path)
+                logger.info("Saved %d proxies to %s", len(ranked), self.list_path)
+            except OSError as e:
+                logger.error("Failed to save proxy list: %s", e)
+        logger.debug("Proxy writer finished after %d batches", self.batches)
+
+    def _run(self):
+        files = {}
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = {}
+                for item in batch:
+                    if item is not None:
+                        lines.setdefault(item[0], []).append(item[1])
+                for path, path_lines in lines.items():
+                    try:
+                        if path not in files:
+                            files[path] = open(path, "w" if path == self.list_path else "a", encoding="utf-8")
+                        files[path].write("".join(f"{line}\n" for line in path_lines))
+                        files[path].flush()
+                    except OSError as e:
+                        logger.error("Failed to write %d lines to %s: %s", len(path_lines), path, e)
+                self.batches += 1
+                if None in batch:
+                    return
+        finally:
+            for f in files.values():
+                f.close()
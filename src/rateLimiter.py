@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per second with bursts of ``burst``.
+
+    Callers reserve a token up front and sleep off any debt outside the lock,
+    so waiting threads are served in arrival order without polling.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, blocking until it is available; returns the time waited."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hold back further calls for at least ``seconds`` (e.g. after an HTTP 429)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """Per-source token buckets plus one global budget of concurrent requests.
+
+    ``limits`` maps a key (a source such as ``"github"``, or ``"host:<name>"``)
+    to ``(rate, burst)``; keys without an entry get ``default``. Every
+    outbound call goes through ``slot(key)``, which waits for the key's token
+    and then for a free place in the ``concurrency`` budget.
+    """
+
+    def __init__(self, limits=None, default=(2.0, 4), concurrency=32):
+        self.limits = dict(limits or {})
+        self.default = default
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._budget = threading.BoundedSemaphore(concurrency)
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = self.limits.get(key, self.default)
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    @contextmanager
+    def slot(self, key):
+        """Rate-limit one request for ``key`` and hold a place in the global budget while it runs."""
+        waited = self.bucket(key).acquire()
+        if waited > 1:
+            logger.debug("Throttled %s for %.1fs", key, waited)
+        with self._budget:
+            yield
+
+    def pause(self, key, seconds):
+        logger.info("Backing off %s for %.0fs", key, seconds)
+        self.bucket(key).pause(seconds)
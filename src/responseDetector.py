@@ -0,0 +1,124 @@
+import re
+
+# Database error messages by engine; matched case-insensitively
+DB_ERROR_SIGNATURES = {
+    "mysql": ["you have an error in your sql syntax", "warning: mysql_", "mysql_fetch_", "mysqli_fetch_",
+              "valid mysql result", "check the manual that corresponds to your mysql server version"],
+    "postgresql": ["pg::syntaxerror", "syntax error at or near", "unterminated quoted string at or near",
+                   "pg_query(): query failed", "psqlexception"],
+    "mssql": ["unclosed quotation mark after the character string", "microsoft ole db provider for sql server",
+              "odbc sql server driver", "incorrect syntax near", "sqlserverexception"],
+    "oracle": ["quoted string not properly terminated", "sql command not properly ended", "ora-00933",
+               "ora-01756", "ora-00936", "ora-00921"],
+    "sqlite": ["sqlite_error", "sqlite3::", "sqlite3.operationalerror", "sqliteexception", "unrecognized token:"],
+    "generic": ["sqlstate[", "jdbc.sqlexception", "syntax error in string in query expression",
+                "sql syntax error", "error in your sql syntax"],
+}
+
+# Browser console lines caused by the server failing on the submitted request
+SERVER_ERROR_SIGNATURES = {
+    "http-500": ["the server responded with a status of 500"],
+}
+
+
+class PageSnapshot:
+    """One captured response: page source, console messages and a dialog's text, if any.
+
+    Detector results are cached on the snapshot, so every check made against
+    the same response shares a single scan.
+    """
+
+    def __init__(self, source, console_logs=(), alert_text=None):
+        self.source = source or ""
+        self.console_logs = [log["message"] if isinstance(log, dict) else log
+                             for log in console_logs if not isinstance(log, dict) or "message" in log]
+        self.alert_text = alert_text
+        self._findings = {}
+
+
+def _trie_pattern(words):
+    """Regex matching any of ``words`` whose cost does not grow with their number.
+
+    The words are merged into a prefix trie, so the engine only ever follows
+    one branch per character instead of trying every word at every position.
+    Longer words win over their own prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class ResponseDetector:
+    """Finds payload markers and error signatures of several categories in one pass.
+
+    ``markers`` maps a category (e.g. "xss") to strings reported as
+    themselves; ``signatures`` maps a category to ``{label: [phrases]}``
+    reported by label. All of them are merged into one trie-shaped pattern
+    and matched case-insensitively against the lowercased response, so a
+    response is scanned once and the cost does not grow with the number of
+    payloads. ``console_markers`` are only looked for in console messages,
+    for output that would be a false alarm in page text (e.g. an escaped
+    payload quoted back).
+    """
+
+    def __init__(self, markers=None, signatures=None, console_markers=None):
+        self._labels = {}
+        for category, words in (markers or {}).items():
+            for word in words:
+                if word:
+                    self._labels.setdefault(word.lower(), set()).add((category, word))
+        for category, rules in (signatures or {}).items():
+            for label, phrases in rules.items():
+                for phrase in phrases:
+                    self._labels.setdefault(phrase.lower(), set()).add((category, label))
+        self.categories = {category for labels in self._labels.values() for category, _ in labels}
+        self._pattern = re.compile(_trie_pattern(self._labels)) if self._labels else None
+        self._console_only = ResponseDetector(markers=console_markers) if console_markers else None
+        if self._console_only:
+            self.categories |= self._console_only.categories
+
+    def scan(self, text):
+        """Return {category: set of matched markers / signature labels} for a text."""
+        findings = {category: set() for category in self.categories}
+        if self._pattern is None or not text:
+            return findings
+        for match in set(self._pattern.findall(text.lower())):
+            for category, label in self._labels[match]:
+                findings[category].add(label)
+        return findings
+
+    def analyze(self, snapshot):
+        """Findings in a snapshot's page source and console, scanned once and cached."""
+        findings = snapshot._findings.get(id(self))
+        if findings is None:
+            findings = self.scan(snapshot.source)
+            if snapshot.console_logs:
+                console_text = "\n".join(snapshot.console_logs)
+                for detector in filter(None, (self, self._console_only)):
+                    for category, hits in detector.scan(console_text).items():
+                        findings[category] |= hits
+            snapshot._findings[id(self)] = findings
+        return findings
+
+    def new_findings(self, snapshot, baseline=None, category=None):
+        """Findings in ``snapshot`` that the ``baseline`` response did not already show.
+
+        Returns the set for ``category``, or the full mapping when it is None.
+        """
+        findings = self.analyze(snapshot)
+        if baseline is not None:
+            known = self.analyze(baseline)
+            findings = {c: hits - known[c] for c, hits in findings.items()}
+        return findings.get(category, set()) if category else findings
@@ -0,0 +1,194 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SINK_EXTENSIONS = {"text": ".txt", "jsonl": ".jsonl", "sqlite": ".db"}
+
+
+class ResultSink:
+    """Thread-safe buffered result writer.
+
+    Results are buffered and written in batches of ``batch_size``, or sooner
+    once ``flush_interval`` seconds have passed since the last flush, so
+    output can be tailed while a long scan is still running.
+    """
+
+    def __init__(self, batch_size=20, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def write(self, result):
+        with self._lock:
+            self._buffer.append(result)
+            self.count += 1
+            if (len(self._buffer) >= self.batch_size or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._close()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _write_batch(self, results):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class MemorySink(ResultSink):
+    """Keeps results in a list; for callers that want them back from crawl_website."""
+
+    def __init__(self):
+        super().__init__(batch_size=1)
+        self.results = []
+
+    def _write_batch(self, results):
+        self.results.extend(results)
+
+
+class TextSink(ResultSink):
+    """The human-readable report format."""
+
+    def __init__(self, path, append=False, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write_batch(self, results):
+        for result in results:
+            self._file.write(format_result(result))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per line."""
+
+    def __init__(self, path, append=False, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write_batch(self, results):
+        self._file.write("".join(json.dumps(result) + "\n" for result in results))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class SqliteSink(ResultSink):
+    """A results table with the common fields as columns and the full record as JSON."""
+
+    def __init__(self, path, append=False, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if not append:
+            self._conn.execute("DROP TABLE IF EXISTS results")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT,
+                payload TEXT,
+                vulnerable INTEGER,
+                status TEXT,
+                data TEXT
+            )""")
+        self._conn.commit()
+
+    def _write_batch(self, results):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (url, payload, vulnerable, status, data) VALUES (?, ?, ?, ?, ?)",
+                [(r.get("url"), r.get("payload"), int(bool(r.get("vulnerable"))), r.get("status"), json.dumps(r))
+                 for r in results])
+
+    def _close(self):
+        self._conn.close()
+
+
+class MultiSink:
+    """Fans each result out to several sinks."""
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    @property
+    def count(self):
+        return self.sinks[0].count if self.sinks else 0
+
+    def write(self, result):
+        for sink in self.sinks:
+            sink.write(result)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+SINK_TYPES = {"text": TextSink, "jsonl": JsonlSink, "sqlite": SqliteSink}
+
+
+def open_sinks(formats, base_path, append=False):
+    """Open one sink per format, writing to ``base_path`` plus the format's extension."""
+    sinks = []
+    for name in formats:
+        path = base_path + SINK_EXTENSIONS[name]
+        sinks.append(SINK_TYPES[name](path, append=append))
+        logger.info(f"Streaming {name} results to {path}")
+    return MultiSink(sinks)
+
+
+def format_result(result):
+    """Render one result in the text report format."""
+    lines = [
+        f"URL: {result['url']}",
+    ]
+    if "form" in result:
+        lines.append(f"Form: {result['form']}")
+    lines += [
+        f"Payload: {result['payload']}",
+        f"Vulnerable: {result['vulnerable']}",
+        f"Status: {result['status']}",
+    ]
+    if result.get("vulnerable_fields"):
+        lines.append(f"Vulnerable Fields: {', '.join(result['vulnerable_fields'])}")
+    if result.get("evidence"):
+        lines.append(f"Evidence: {', '.join(result['evidence'])}")
+    lines += [
+        f"Response Snippet: {result.get('response_snippet', '')}",
+        f"Console Logs: {result.get('console_logs', [])}",
+    ]
+    if "settle_time" in result:
+        lines.append(f"Settle Time: {result['settle_time']}s")
+    if result.get("screenshot"):
+        lines.append(f"Screenshot: {result['screenshot']}")
+    lines.append("-" * 50)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,79 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    added REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScanCheckpoint:
+    """SQLite record of a scan's frontier and visited URLs.
+
+    Every URL the scheduler accepts is stored as pending and marked done once
+    its results have been handed to the result sinks, so an interrupted scan
+    can pick up exactly where it stopped. Pages that were in flight when the
+    process died are simply pending again.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        if not resume:
+            for stale in (path, f"{path}-wal", f"{path}-shm"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def add_urls(self, urls):
+        """Record newly queued URLs as pending."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO urls (url, added) VALUES (?, ?)",
+                                   [(url, now) for url in urls])
+
+    def complete(self, url):
+        """Mark a page as done."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE urls SET state = 'done' WHERE url = ?", (url,))
+
+    def pending_urls(self):
+        """URLs still to crawl, in the order they were queued."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls WHERE state != 'done' ORDER BY added, rowid").fetchall()
+        return [row[0] for row in rows]
+
+    def done_urls(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls WHERE state = 'done'").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,146 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, as in a Prometheus histogram
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+_NO_SPAN = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed durations."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == math.inf else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "buckets": buckets,
+        }
+
+
+class ScanMetrics:
+    """Per-phase timings and counters for a run.
+
+    Wrap a phase in ``with metrics.span("page_load"):`` to record its
+    duration. While disabled, ``span`` hands back a shared no-op context and
+    ``count``/``observe`` return immediately, so instrumented code costs next
+    to nothing unless ``enable`` was called.
+    """
+
+    def __init__(self, enabled=False, prefix="scan"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._started = time.monotonic()
+
+    def enable(self):
+        self.enabled = True
+        self._started = time.monotonic()
+
+    def span(self, name):
+        """Context manager timing one occurrence of a phase."""
+        if not self.enabled:
+            return _NO_SPAN
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "elapsed": round(time.monotonic() - self._started, 3),
+                "phases": {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        data = self.to_dict()
+        seconds = f"{self.prefix}_phase_duration_seconds"
+        lines = [f"# HELP {seconds} Time spent per scan phase.", f"# TYPE {seconds} histogram"]
+        for name, histogram in data["phases"].items():
+            label = f'phase="{name}"'
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'{seconds}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f"{seconds}_sum{{{label}}} {histogram['sum']}")
+            lines.append(f"{seconds}_count{{{label}}} {histogram['count']}")
+        for name, value in data["counters"].items():
+            metric = f"{self.prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        lines += [f"# TYPE {self.prefix}_elapsed_seconds gauge", f"{self.prefix}_elapsed_seconds {data['elapsed']}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to ``path``: Prometheus text for ``.prom`` files, JSON otherwise."""
+        content = self.to_prometheus() if path.endswith(".prom") else json.dumps(self.to_dict(), indent=1)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved run metrics to {path}")
+        except OSError as e:
+            logger.error(f"Failed to save metrics {path}: {e}")
+
+    def log_summary(self):
+        """Log total and mean time per phase, most expensive phase first."""
+        phases = self.to_dict()["phases"]
+        for name, h in sorted(phases.items(), key=lambda item: -item[1]["sum"]):
+            logger.info(f"{name:<16} {h['count']:>7}x  total {h['sum']:9.2f}s  mean {h['mean']:8.4f}s  "
+                        f"max {h['max']:8.3f}s")
@@ -0,0 +1,146 @@
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; screenshots are then stored as captured PNGs
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_POLICIES = ("never", "on-vulnerable", "always")
+SCREENSHOT_FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg"), "png": ("PNG", ".png")}
+
+
+class ScreenshotPipeline:
+    """Captures probe screenshots by policy and encodes them off the probing thread.
+
+    ``policy`` is one of SCREENSHOT_POLICIES. Only the capture itself runs in
+    the caller's thread: preferably just the probed form, otherwise the
+    viewport. Downscaling to ``max_width`` and encoding to ``image_format``
+    at ``quality`` happen on a small worker pool; without Pillow the captured
+    PNG is written as is. Once the written files reach ``budget_bytes``, no
+    further screenshots are taken in this scan.
+    """
+
+    def __init__(self, directory, policy="on-vulnerable", budget_bytes=200 * 1024 * 1024, image_format="webp",
+                 quality=60, max_width=1024, crop=True, workers=2, metrics=None):
+        if policy not in SCREENSHOT_POLICIES:
+            raise ValueError(f"Unknown screenshot policy {policy!r}; choose from {SCREENSHOT_POLICIES}")
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Unknown screenshot format {image_format!r}; choose from {sorted(SCREENSHOT_FORMATS)}")
+        self.directory = directory
+        self.policy = policy
+        self.budget_bytes = budget_bytes
+        self.image_format = image_format if Image is not None else "png"
+        self.quality = quality
+        self.max_width = max_width
+        self.crop = crop
+        self.workers = workers
+        self.metrics = metrics
+        self.saved = 0
+        self.skipped = 0
+        self._used = 0  # Bytes written, plus the raw size of captures still being encoded
+        self._counter = 0
+        self._run = time.strftime("%Y%m%d-%H%M%S")  # Keeps file names of separate scans apart
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = set()
+        # Reported on the first capture, so a pipeline that never takes a screenshot stays quiet.
+        self._missing_encoder = image_format if Image is None and image_format != "png" else None
+
+    def wants(self, vulnerable):
+        """Whether a result of this kind gets a screenshot under the policy and remaining budget."""
+        if self.policy == "never" or (self.policy == "on-vulnerable" and not vulnerable):
+            return False
+        with self._lock:
+            if self._used < self.budget_bytes:
+                return True
+            self.skipped += 1
+            if self.skipped == 1:
+                logger.warning(f"Screenshot budget of {self.budget_bytes / 1e6:.0f} MB used up; "
+                               f"no more screenshots in this scan")
+            return False
+
+    def capture(self, driver, name, vulnerable, element=None):
+        """Capture a screenshot if the policy wants one and queue it for encoding.
+
+        ``element`` is a callable returning the WebElement to crop to (or
+        None to capture the viewport). Returns the path the image will be
+        written to, or None if no screenshot was taken.
+        """
+        if not self.wants(vulnerable):
+            return None
+        if self._missing_encoder:
+            logger.warning(f"Pillow is not installed; screenshots are saved as full-size PNGs instead of "
+                           f"{self._missing_encoder} (pip install -r requirements.txt)")
+            self._missing_encoder = None
+        try:
+            with self._span("screenshot"):
+                target = element() if self.crop and element else None
+                png = target.screenshot_as_png if target is not None else driver.get_screenshot_as_png()
+        except Exception as e:
+            logger.debug(f"Screenshot of {name} failed: {e}")
+            return None
+        with self._lock:
+            self._counter += 1
+            path = os.path.join(self.directory, f"{name}_{self._run}_{self._counter:05d}{SCREENSHOT_FORMATS[self.image_format][1]}")
+            self._used += len(png)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screenshot")
+            future = self._executor.submit(self._write, png, path)
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return path
+
+    def drain(self):
+        """Wait until every queued screenshot has been written."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        if self.saved or self.skipped:
+            logger.info(f"Screenshots: {self.saved} saved ({self._used / 1e6:.1f} MB), "
+                        f"{self.skipped} skipped over budget")
+
+    def close(self):
+        self.drain()
+        if self._executor:
+            self._executor.shutdown()
+
+    def _write(self, png, path):
+        try:
+            with self._span("screenshot_encode"):
+                data = self._encode(png)
+                with open(path, "wb") as f:
+                    f.write(data)
+        except Exception as e:
+            logger.warning(f"Could not write screenshot {path}: {e}")
+            data = b""
+        with self._lock:
+            self._used += len(data) - len(png)
+            if data:
+                self.saved += 1
+
+    def _encode(self, png):
+        if Image is None:
+            return png
+        with Image.open(io.BytesIO(png)) as image:
+            if image.width > self.max_width:
+                image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+            if self.image_format == "jpeg":
+                image = image.convert("RGB")
+            out = io.BytesIO()
+            image.save(out, SCREENSHOT_FORMATS[self.image_format][0], quality=self.quality, optimize=True)
+            return out.getvalue()
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _span(self, name):
+        return self.metrics.span(name) if self.metrics else nullcontext()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data):
+    """Stable hash of fetched content, used to skip re-parsing unchanged pages."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class SourceCache:
+    """On-disk cache of harvested sources and the proxies found in them.
+
+    Entries are keyed by source (``url:<url>``, ``repo:<full name>``,
+    ``blob:<sha>``, ``reddit:<id>``) and hold whatever is needed to tell
+    whether the source changed since the last harvest: ETag/Last-Modified
+    validators, content hashes, blob SHAs or edit timestamps. Entries not
+    touched for ``max_age`` seconds are dropped on save.
+    """
+
+    def __init__(self, path, max_age=30 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["seen_at"] = time.time()
+            return dict(entry) if entry is not None else None
+
+    def put(self, key, **fields):
+        with self._lock:
+            fields["seen_at"] = time.time()
+            self._entries[key] = fields
+
+    def record(self, hit):
+        """Count a cache hit or miss for the end-of-run summary."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def save(self):
+        now = time.time()
+        with self._lock:
+            entries = {k: v for k, v in self._entries.items() if now - v.get("seen_at", 0) < self.max_age}
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            logger.info("Saved %d source cache entries to %s (%d unchanged, %d fetched)",
+                        len(entries), self.path, self.hits, self.misses)
+        except OSError as e:
+            logger.error("Failed to save source cache %s: %s", self.path, e)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            logger.info("Loaded %d source cache entries from %s", len(self._entries), self.path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable source cache %s: %s", self.path, e)
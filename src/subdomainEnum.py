@@ -0,0 +1,327 @@
+import asyncio
+import logging
+import random
+import socket
+import string
+import struct
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from asyncThread import start_async_thread
+from linkDiscovery import HEADERS, DEFAULT_PORTS
+
+logger = logging.getLogger(__name__)
+
+DNS_TIMEOUT = 2.0  # Seconds before a query is retried on the next nameserver
+DNS_RETRIES = 2
+DNS_CONCURRENCY = 500  # Queries in flight
+PROBE_CONCURRENCY = 50  # Hosts probed over HTTP(S) at a time
+PROBE_TIMEOUT = 5
+WILDCARD_PROBES = 3  # Random names resolved to detect wildcard DNS
+FALLBACK_NAMESERVERS = ["1.1.1.1", "8.8.8.8"]
+
+TYPE_A = 1
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+
+def load_wordlists(paths):
+    """Distinct subdomain labels of the wordlist files, in file order."""
+    words = {}
+    for path in paths:
+        with open(path, encoding="utf-8", errors="ignore") as file:
+            for line in file:
+                word = line.strip().strip(".").lower()
+                if word and not word.startswith("#"):
+                    words.setdefault(word, None)
+    return list(words)
+
+
+def base_domain(host):
+    """The domain whose subdomains are enumerated for a scan of ``host``."""
+    host = host.lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def system_nameservers(path="/etc/resolv.conf"):
+    """Nameservers from resolv.conf, or public ones if there are none."""
+    nameservers = []
+    try:
+        with open(path) as file:
+            for line in file:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    nameservers.append(fields[1])
+    except OSError:
+        pass
+    if not nameservers:
+        logger.info(f"No nameservers in {path}, using {', '.join(FALLBACK_NAMESERVERS)}")
+    return nameservers or list(FALLBACK_NAMESERVERS)
+
+
+def parse_nameserver(nameserver):
+    """(host, port) of HOST, HOST:PORT or [IPV6]:PORT."""
+    if nameserver.startswith("["):
+        host, _, port = nameserver[1:].partition("]")
+        return host, int(port.lstrip(":") or 53)
+    if nameserver.count(":") == 1:
+        host, port = nameserver.split(":")
+        return host, int(port)
+    return nameserver, 53
+
+
+def encode_name(name):
+    labels = name.rstrip(".").encode("idna").split(b".")
+    if any(not label or len(label) > 63 for label in labels):
+        raise ValueError(f"Invalid DNS name {name!r}")
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\0"
+
+
+def build_query(query_id, question):
+    """A recursive query for ``question`` (an encoded name) as a UDP payload."""
+    return struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + question + struct.pack("!HH", TYPE_A, CLASS_IN)
+
+
+def parse_response(data):
+    """(query id, question name, rcode, IPv4 addresses) of a DNS response."""
+    query_id, flags, qdcount, ancount = struct.unpack_from("!HHHH", data)
+    offset = _skip_name(data, 12)
+    question = data[12:offset].lower()
+    offset += 4
+    for _ in range(qdcount - 1):
+        offset = _skip_name(data, offset) + 4
+    addresses = []
+    for _ in range(ancount):
+        offset = _skip_name(data, offset)
+        rtype, rclass, _, length = struct.unpack_from("!HHIH", data, offset)
+        offset += 10
+        if rtype == TYPE_A and rclass == CLASS_IN and length == 4:
+            addresses.append(socket.inet_ntoa(data[offset:offset + 4]))
+        offset += length
+    return query_id, question, flags & 0xF, addresses
+
+
+def _skip_name(data, offset):
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:  # Compression pointer ends the name
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+
+class DnsResolver:
+    """Asyncio DNS client sending A queries over UDP straight to ``nameservers``.
+
+    Keeps one socket per nameserver and at most ``concurrency`` queries in
+    flight, rotating through the nameservers and retrying an unanswered
+    query on the next one after ``timeout`` seconds. Answers, NXDOMAIN
+    included, are cached for the resolver's lifetime; failures are not.
+    Use as an async context manager inside the loop it runs on.
+    """
+
+    def __init__(self, nameservers, timeout=DNS_TIMEOUT, retries=DNS_RETRIES, concurrency=DNS_CONCURRENCY):
+        self.nameservers = [parse_nameserver(nameserver) for nameserver in nameservers]
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = max(1, concurrency)
+        self.cache = {}
+        self.queries = 0
+        self.cache_hits = 0
+        self.failures = 0
+        self._transports = []
+        self._pending = {}  # (nameserver index, query id) -> (question, future)
+        self._next = 0
+        self._semaphore = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for index, address in enumerate(self.nameservers):
+            transport, _ = await loop.create_datagram_endpoint(lambda index=index: _DnsProtocol(self, index),
+                                                               remote_addr=address)
+            self._transports.append(transport)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+
+    async def resolve(self, name):
+        """IPv4 addresses of ``name`` (empty if it does not exist), or None if no nameserver answered."""
+        name = name.lower().rstrip(".")
+        if name in self.cache:
+            self.cache_hits += 1
+            return self.cache[name]
+        question = encode_name(name).lower()
+        async with self._semaphore:
+            for _ in range(self.retries + 1):
+                index = self._next
+                self._next = (self._next + 1) % len(self._transports)
+                query_id = random.getrandbits(16)
+                while (index, query_id) in self._pending:
+                    query_id = random.getrandbits(16)
+                future = asyncio.get_running_loop().create_future()
+                self._pending[(index, query_id)] = (question, future)
+                try:
+                    self._transports[index].sendto(build_query(query_id, question))
+                    self.queries += 1
+                    rcode, addresses = await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    continue
+                finally:
+                    self._pending.pop((index, query_id), None)
+                if rcode in (0, RCODE_NXDOMAIN):
+                    self.cache[name] = tuple(sorted(set(addresses)))
+                    return self.cache[name]
+                logger.debug(f"{self.nameservers[index][0]} answered {name} with rcode {rcode}")
+        self.failures += 1
+        return None
+
+    def _answer(self, index, data):
+        try:
+            query_id, question, rcode, addresses = parse_response(data)
+        except (struct.error, IndexError):
+            return
+        pending = self._pending.get((index, query_id))
+        # Responses for a different name are ignored, as spoofed or stale.
+        if pending and pending[0] == question and not pending[1].done():
+            pending[1].set_result((rcode, addresses))
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver, index):
+        self.resolver = resolver
+        self.index = index
+
+    def datagram_received(self, data, addr):
+        self.resolver._answer(self.index, data)
+
+    def error_received(self, exc):
+        logger.debug(f"DNS socket error: {exc}")
+
+
+class CachedResolver(AbstractResolver):
+    """aiohttp resolver answering from a DnsResolver, so probes reuse its lookups."""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        addresses = await self.resolver.resolve(host)
+        if not addresses:
+            raise OSError(f"Could not resolve {host}")
+        return [{"hostname": host, "host": address, "port": port, "family": socket.AF_INET, "proto": 0,
+                 "flags": socket.AI_NUMERICHOST} for address in addresses]
+
+    async def close(self):
+        pass
+
+
+class SubdomainEnumerator:
+    """Expands a base domain into live web hosts using wordlists.
+
+    Every word becomes a candidate ``word.domain``, resolved through
+    ``resolver`` (a DnsResolver, opened by ``run``). Random names are
+    resolved first to detect wildcard DNS; candidates resolving only to the
+    wildcard's addresses are dropped. The remaining hosts are probed over
+    ``schemes`` ((scheme, port) pairs, tried in order) while resolution goes
+    on, and the base URL of the first one answering is handed to
+    ``on_live(url)``. Any HTTP response counts as live.
+    """
+
+    def __init__(self, domain, words, resolver, on_live=None, schemes=(("https", 443), ("http", 80)),
+                 probe_concurrency=PROBE_CONCURRENCY, probe_timeout=PROBE_TIMEOUT, proxy_picker=None,
+                 should_stop=None):
+        self.domain = base_domain(domain)
+        self.words = words
+        self.resolver = resolver
+        self.on_live = on_live
+        self.schemes = list(schemes)
+        self.probe_concurrency = max(1, probe_concurrency)
+        self.probe_timeout = probe_timeout
+        self.proxy_picker = proxy_picker
+        self.should_stop = should_stop or (lambda: False)
+        self.wildcard = set()
+        self.resolved = {}  # host -> addresses
+        self.live = {}  # host -> base URL
+        self.wildcard_matches = 0
+
+    def start_in_thread(self, on_finished=None):
+        """Run the enumeration on its own event loop in a daemon thread."""
+        return start_async_thread(self.run, "subdomain-enum", "Subdomain enumeration", on_finished)
+
+    async def run(self):
+        async with self.resolver:
+            self.wildcard = await self._detect_wildcard()
+            if self.wildcard:
+                logger.info(f"Wildcard DNS on *.{self.domain} ({', '.join(sorted(self.wildcard))}); "
+                            f"names resolving only there are ignored")
+            hosts = asyncio.Queue()
+            candidates = iter([self.domain] + [f"{word}.{self.domain}" for word in self.words])
+            connector = aiohttp.TCPConnector(limit=self.probe_concurrency, resolver=CachedResolver(self.resolver),
+                                             ssl=False)
+            timeout = aiohttp.ClientTimeout(total=self.probe_timeout)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as session:
+                probers = [asyncio.create_task(self._probe_worker(session, hosts))
+                           for _ in range(self.probe_concurrency)]
+                await asyncio.gather(*(self._resolve_worker(candidates, hosts)
+                                       for _ in range(self.resolver.concurrency)))
+                for _ in probers:
+                    hosts.put_nowait(None)
+                await asyncio.gather(*probers)
+        logger.info(f"Subdomain enumeration of {self.domain}: {len(self.resolved)} names resolved, "
+                    f"{len(self.live)} live, {self.wildcard_matches} wildcard matches dropped; "
+                    f"{self.resolver.queries} DNS queries, {self.resolver.cache_hits} cache hits, "
+                    f"{self.resolver.failures} failed")
+
+    async def _detect_wildcard(self):
+        addresses = set()
+        for _ in range(WILDCARD_PROBES):
+            label = "".join(random.choices(string.ascii_lowercase + string.digits, k=16))
+            addresses.update(await self.resolver.resolve(f"{label}.{self.domain}") or ())
+        return addresses
+
+    async def _resolve_worker(self, candidates, hosts):
+        # The workers share one iterator, so every candidate is resolved once.
+        for host in candidates:
+            if self.should_stop():
+                return
+            try:
+                addresses = await self.resolver.resolve(host)
+            except ValueError:
+                continue
+            if not addresses:
+                continue
+            if self.wildcard and set(addresses) <= self.wildcard:
+                self.wildcard_matches += 1
+                continue
+            self.resolved[host] = addresses
+            hosts.put_nowait(host)
+
+    async def _probe_worker(self, session, hosts):
+        while True:
+            host = await hosts.get()
+            if host is None:
+                return
+            if self.should_stop():
+                continue
+            url = await self._probe(session, host)
+            if url:
+                self.live[host] = url
+                logger.info(f"Live subdomain: {url}")
+                if self.on_live:
+                    self.on_live(url)
+
+    async def _probe(self, session, host):
+        """Base URL of the first scheme ``host`` answers HTTP on, or None."""
+        for scheme, port in self.schemes:
+            url = f"{scheme}://{host}{'' if port == DEFAULT_PORTS[scheme] else f':{port}'}/"
+            proxy = self.proxy_picker() if self.proxy_picker else None
+            try:
+                async with session.get(url, proxy=f"http://{proxy}" if proxy else None, allow_redirects=False):
+                    return url
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                logger.debug(f"{url} is not live: {e}")
+        return None
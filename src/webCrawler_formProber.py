@@ -2,15 +2,32 @@ import argparse
 import logging
 import os
 import signal
+import threading
 import time
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlparse
+import requests
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from bs4 import BeautifulSoup
-import random
+from driverPool import DriverPool
+from crawlScheduler import CrawlScheduler
+from browserProber import BrowserProber
+from responseDetector import ResponseDetector, DB_ERROR_SIGNATURES, SERVER_ERROR_SIGNATURES
+from httpProber import HttpProber, BASELINE_VALUE
+from payloadCorpus import PayloadCorpus, reflection_contexts, field_contexts
+from linkDiscovery import LinkDiscovery, normalize_url
+from formCache import FormCache, page_form_fingerprints
+from scanCheckpoint import ScanCheckpoint
+from resultSinks import MemorySink, TextSink, SINK_TYPES, open_sinks
+from proxyManager import ProxyManager
+from distributedScan import ScanCoordinator, ScanWorker, LEASE_TIMEOUT, is_loopback
+from scanMetrics import ScanMetrics
+from browserProfile import BROWSER_PROFILES, browser_options, apply_profile
+from pageReadiness import prepare_settle_wait, wait_for_settle
+from subdomainEnum import SubdomainEnumerator, DnsResolver, load_wordlists, system_nameservers, DNS_CONCURRENCY
+from screenshotPipeline import ScreenshotPipeline, SCREENSHOT_POLICIES, SCREENSHOT_FORMATS
 
 # Output directory
 OUTPUT_DIR = "Output"
@@ -18,6 +35,49 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Path For Proxy Server List File
 PROXY_LIST = os.path.join(OUTPUT_DIR, 'proxy_list.txt')
+PROXY_STATS = os.path.join(OUTPUT_DIR, 'proxy_stats.json')
+
+# Driver pool defaults
+PAGE_LOAD_TIMEOUT = 30  # Seconds before a page load (and its proxy) counts as failed
+DRIVER_POOL_SIZE = 1
+DRIVER_RECYCLE_AFTER = 25  # Pages served by one browser before it is restarted
+BROWSER_PROFILE = "full"  # full, or lean (no images/fonts/media, off-scope hosts blocked, eager loads) via --browser-profile
+ALLOW_HOSTS = []  # Hosts besides the scanned one (and their subdomains) a lean browser may load from
+
+# Crawl scheduling defaults
+CRAWL_WORKERS = 1
+MAX_PER_HOST = None  # Max pages of one host being probed concurrently; None allows one per worker
+
+# Readiness wait after submitting a payload
+SETTLE_TIMEOUT = 10.0  # Upper bound in seconds
+SETTLE_QUIET = 0.15  # Seconds without network activity or DOM mutations that count as settled
+
+# HTTP fast path: probe server-rendered forms without a browser
+HTTP_FIRST = False
+HTTP_TIMEOUT = 10
+
+# Async link discovery running ahead of the probing workers
+DISCOVER_LINKS = False
+DISCOVERY_CONCURRENCY = 50
+DISCOVERY_LIMIT = 10000  # Max URLs the discovery stage will queue
+
+# Subdomain enumeration seeding the crawl with the live hosts of the scanned domain
+SUBDOMAIN_WORDLISTS = ["../config/subdomains-10000.txt", "../config/subdomains-uk-1000.txt"]
+
+# Form fingerprint cache: forms already probed are only spot-checked
+FORM_CACHE_FILE = os.path.join(OUTPUT_DIR, 'form_cache.json')
+FORM_CACHE_TTL = 7 * 24 * 3600
+SPOT_CHECK_PAYLOADS = 1  # Payloads sent to a known form; 0 skips it entirely
+
+# Per-phase timings; only collected when enabled with --metrics
+METRICS = ScanMetrics(prefix="formprober")
+
+# Screenshots of browser probes, encoded in the background
+SCREENSHOT_POLICY = "on-vulnerable"  # never, on-vulnerable or always
+SCREENSHOT_BUDGET_MB = 200  # Per scan
+SCREENSHOT_FORMAT = "webp"  # webp, jpeg or png; needs Pillow, otherwise PNGs are kept as captured
+SCREENSHOTS = ScreenshotPipeline(OUTPUT_DIR, SCREENSHOT_POLICY, SCREENSHOT_BUDGET_MB * 1024 * 1024,
+                                 SCREENSHOT_FORMAT, metrics=METRICS)
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -46,6 +106,55 @@ SQL_PAYLOADS = [
     "' OR 1=1 --",
 ]
 
+# Built-in payloads plus payload files added with --payloads
+PAYLOADS = PayloadCorpus({"XSS": XSS_PAYLOADS, "SQL": SQL_PAYLOADS})
+
+# Console output of an executed XSS payload
+XSS_CONSOLE_MARKERS = ["alert(", "console.log('xss')"]
+
+# Characters HTML escaping rewrites; a payload without any of them (e.g.
+# javascript:alert(1)) also shows up verbatim on a page that echoes it safely.
+HTML_ESCAPED_CHARS = "<>\"'&"
+
+def build_detector(corpus):
+    """One detector for both tests: every response is scanned once for reflected
+    XSS payloads of the corpus and database/server error signatures.
+    Payloads escaping would leave unchanged are sent but not used as markers."""
+    return ResponseDetector(
+        markers={"xss": (payload for payload in corpus.select("XSS")
+                         if any(char in payload for char in HTML_ESCAPED_CHARS))},
+        signatures={"sql": {**DB_ERROR_SIGNATURES, **SERVER_ERROR_SIGNATURES}},
+        console_markers={"xss": XSS_CONSOLE_MARKERS},
+    )
+
+DETECTOR = build_detector(PAYLOADS)
+
+def xss_evidence(payload, snapshot, baseline=None):
+    """XSS evidence: an alert dialog, or payload markers the baseline response did not contain."""
+    evidence = DETECTOR.new_findings(snapshot, baseline, "xss")
+    if snapshot.alert_text is not None:
+        evidence = evidence | {"alert dialog"}
+    return evidence
+
+def sql_evidence(payload, snapshot, baseline=None):
+    """SQL injection evidence: database or server errors the baseline response did not show."""
+    return DETECTOR.new_findings(snapshot, baseline, "sql")
+
+def payload_contexts(fields, baseline):
+    """Contexts a form's payloads are picked for: its field types and value kinds, where the
+    baseline value was reflected, and database engines the baseline response already names.
+    None (every payload) when there is no baseline."""
+    if baseline is None:
+        return None
+    return (field_contexts(fields) | reflection_contexts(baseline.source, BASELINE_VALUE) |
+            DETECTOR.analyze(baseline).get("sql", set()))
+
+def payload_selector(test_name, limit=None):
+    """Payloads of a test streamed from the corpus, picked per form by payload_contexts."""
+    def select(fields, baseline):
+        return PAYLOADS.select(test_name, payload_contexts(fields, baseline), limit)
+    return select
+
 # Load proxy list once at startup
 def load_proxy_list():
     """Load proxy servers from the file into a list."""
@@ -62,200 +171,451 @@ def load_proxy_list():
         return None
 
 PROXIES = load_proxy_list()
-PROXY_INDEX = 0  # Global index to cycle through proxies
-
-def create_driver():
-    """Create a Selenium WebDriver instance with a rotating proxy."""
-    global PROXY_INDEX
-    options = Options()
-    options.headless = True
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-
-    if PROXIES:
-        proxy = PROXIES[PROXY_INDEX % len(PROXIES)]
-        PROXY_INDEX += 1
+PROXY_MANAGER = ProxyManager(PROXIES, PROXY_STATS) if PROXIES else None
+
+def next_proxy():
+    """Return the best available proxy for a one-off request, or None if no proxies are loaded."""
+    return PROXY_MANAGER.pick(bind=False) if PROXY_MANAGER else None
+
+def bind_proxy():
+    """Return the best available proxy for a new browser, counting it as in use."""
+    return PROXY_MANAGER.pick() if PROXY_MANAGER else None
+
+def release_proxy(proxy):
+    if PROXY_MANAGER and proxy:
+        PROXY_MANAGER.release(proxy)
+
+def browser_scope(domain):
+    """Hosts a lean browser scanning ``domain`` may load resources from."""
+    return [urlparse(f"//{domain}").hostname] + ALLOW_HOSTS
+
+def create_driver(proxy=None, scope=None):
+    """Create a Selenium WebDriver instance bound to the given proxy, limited to ``scope`` hosts if given."""
+    if proxy:
         logger.debug(f"Using proxy: {proxy}")
-        options.add_argument(f'--proxy-server={proxy}')
     else:
         logger.warning("No proxies available, proceeding without proxy.")
+    options = browser_options(BROWSER_PROFILE, proxy, scope)
 
     try:
-        driver = webdriver.Chrome(options=options)
+        with METRICS.span("driver_start"):
+            driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        apply_profile(driver, BROWSER_PROFILE)
         return driver
     except Exception as e:
-        logger.error(f"Failed to create driver with proxy {proxy if PROXIES else 'none'}: {e}")
+        logger.error(f"Failed to create driver with proxy {proxy or 'none'}: {e}")
         return None
 
-def test_XSS_script_injection(driver, url):
-    """Test a page for XSS vulnerabilities by targeting all input fields."""
-    inputs = driver.find_elements(By.TAG_NAME, "input")
-    if not inputs:
-        logger.info(f"No input fields found on {url}, skipping XSS test.")
-        return {
-            "url": url,
-            "payload": "N/A",
-            "vulnerable": False,
-            "status": "No Inputs",
-            "response_snippet": "",
-            "console_logs": []
-        }
-
-    for payload in XSS_PAYLOADS:
-        for input_field in inputs:
-            input_type = input_field.get_attribute("type")
-            if input_type in ["text", "search", "email", "password"]:
-                try:
-                    input_field.clear()
-                    input_field.send_keys(payload)
-                    input_field.send_keys(Keys.RETURN)
-                except Exception as e:
-                    logger.warning(f"Failed to inject payload on {url}: {e}")
-                    continue
-        
-        time.sleep(3)
-        response_source = driver.page_source
-        console_logs = driver.get_log("browser")
-        
-        vulnerable = (any(payload in response_source for payload in XSS_PAYLOADS) or
-                      any("alert(" in log["message"] for log in console_logs if "message" in log) or
-                      any("console.log('xss')" in log["message"] for log in console_logs if "message" in log))
-        
-        result_status = "Vulnerable" if vulnerable else "Not Vulnerable"
-        logger.info(f"Tested {url} with payload {payload}: {result_status}")
-        
-        driver.save_screenshot(os.path.join(OUTPUT_DIR, f"{urlparse(url).netloc}_xss_{time.time()}.png"))
-        
-        return {
-            "url": url,
-            "payload": payload,
-            "vulnerable": vulnerable,
-            "status": result_status,
-            "response_snippet": response_source[:200],
-            "console_logs": [log["message"] for log in console_logs if "message" in log][:5]
-        }
-
-def test_SQL_script_injection(driver, url):
-    """Test a page for SQL injection vulnerabilities by targeting all input fields."""
-    inputs = driver.find_elements(By.TAG_NAME, "input")
-    if not inputs:
-        logger.info(f"No input fields found on {url}, skipping SQL test.")
-        return {
-            "url": url,
-            "payload": "N/A",
-            "vulnerable": False,
-            "status": "No Inputs",
-            "response_snippet": "",
-            "console_logs": []
-        }
-
-    for payload in SQL_PAYLOADS:
-        for input_field in inputs:
-            input_type = input_field.get_attribute("type")
-            if input_type in ["text", "search", "email", "password"]:
-                try:
-                    input_field.clear()
-                    input_field.send_keys(payload)
-                    input_field.send_keys(Keys.RETURN)
-                except Exception as e:
-                    logger.warning(f"Failed to inject payload on {url}: {e}")
-                    continue
-        
-        time.sleep(3)
-        response_source = driver.page_source
-        console_logs = driver.get_log("browser")
-        
-        vulnerable = (any(payload in response_source for payload in SQL_PAYLOADS) or
-                      "error" in response_source.lower() or
-                      "sql" in response_source.lower() or
-                      any("error" in log["message"].lower() for log in console_logs if "message" in log))
-        
-        result_status = "Vulnerable" if vulnerable else "Not Vulnerable"
-        logger.info(f"Tested {url} with payload {payload}: {result_status}")
-        
-        driver.save_screenshot(os.path.join(OUTPUT_DIR, f"{urlparse(url).netloc}_sql_{time.time()}.png"))
-        
-        return {
-            "url": url,
-            "payload": payload,
-            "vulnerable": vulnerable,
-            "status": result_status,
-            "response_snippet": response_source[:200],
-            "console_logs": [log["message"] for log in console_logs if "message" in log][:5]
-        }
-
-def crawl_website(start_url, max_pages=100):
-    """Crawl a website and test for script injection vulnerabilities."""
-    domain = urlparse(start_url).netloc
-    visited, to_crawl, results = set(), [start_url], []
-    
-    while ((to_crawl and len(visited) < max_pages) and (not interrupted)):
-        url = to_crawl.pop(0)
-        if url in visited:
-            continue
+def screenshot_saver(url, test_name):
+    """Screenshot callback for BrowserProber.probe, capturing through SCREENSHOTS."""
+    def save(driver, vulnerable, form_element):
+        return SCREENSHOTS.capture(driver, f"{urlparse(url).netloc}_{test_name}", vulnerable, form_element)
+    return save
+
+def browser_prober(driver, url):
+    return BrowserProber(driver, url, SETTLE_TIMEOUT, SETTLE_QUIET, METRICS)
+
+def test_XSS_script_injection(driver, url, payloads=None, prober=None, form_cache=None):
+    """Test every form on a page for XSS; returns one result per form and payload.
+
+    Forms already probed according to ``form_cache`` are only spot-checked.
+    """
+    prober = prober or browser_prober(driver, url)
+    return prober.probe("XSS", payload_selector("XSS") if payloads is None else payloads, xss_evidence,
+                        screenshot_saver(url, "xss"), form_cache, SPOT_CHECK_PAYLOADS)
+
+def test_SQL_script_injection(driver, url, payloads=None, prober=None, form_cache=None):
+    """Test every form on a page for SQL injection; returns one result per form and payload.
+
+    Forms already probed according to ``form_cache`` are only spot-checked.
+    """
+    prober = prober or browser_prober(driver, url)
+    return prober.probe("SQL", payload_selector("SQL") if payloads is None else payloads, sql_evidence,
+                        screenshot_saver(url, "sql"), form_cache, SPOT_CHECK_PAYLOADS)
+
+def open_frontier(start_url, max_pages, per_host, discover, checkpoint):
+    """Crawl scheduler seeded with ``start_url``, or with what an interrupted scan's checkpoint left to do.
+
+    With ``discover``, the async link discovery stage is started to feed it.
+    """
+    domain = urlparse(normalize_url(start_url)).netloc
+    start_urls, done_urls = [start_url], []
+    if checkpoint:
+        done_urls, pending_urls = checkpoint.done_urls(), checkpoint.pending_urls()
+        if done_urls or pending_urls:
+            logger.info(f"Resuming scan: {len(done_urls)} pages done, {len(pending_urls)} pending")
+            start_urls = pending_urls
+        checkpoint.set_meta("start_url", normalize_url(start_url))
+
+    scheduler = CrawlScheduler(start_urls, max_pages=max_pages, per_host_limit=per_host,
+                               should_stop=lambda: interrupted, normalize=normalize_url,
+                               on_new=checkpoint.add_urls if checkpoint else None)
+    scheduler.mark_visited(done_urls)
+
+    if discover:
+        discovery = LinkDiscovery([start_url], {domain}, lambda url: scheduler.add([url]),
+                                  max_urls=DISCOVERY_LIMIT, concurrency=DISCOVERY_CONCURRENCY,
+                                  timeout=HTTP_TIMEOUT, proxy_picker=next_proxy,
+                                  should_stop=lambda: interrupted or scheduler.visited >= max_pages)
+        scheduler.open_producer()
+        discovery.start_in_thread(on_finished=scheduler.close_producer)
+    return scheduler
+
+def crawl_website(start_url, max_pages=100, pool_size=DRIVER_POOL_SIZE, recycle_after=DRIVER_RECYCLE_AFTER,
+                  workers=CRAWL_WORKERS, per_host=MAX_PER_HOST, http_first=HTTP_FIRST, discover=DISCOVER_LINKS,
+                  form_cache=None, checkpoint=None, sink=None, subdomains=None):
+    """Crawl a website with one or more browser workers and test for script injection vulnerabilities.
+
+    Results are streamed to ``sink`` as each page finishes (a MemorySink
+    collecting them in a list by default), and the sink is returned. With a
+    checkpoint, the frontier and finished pages are recorded as the crawl
+    goes, and a checkpoint left by an interrupted run is resumed. With
+    ``subdomains`` (a SubdomainEnumerator), the live hosts it finds are
+    added to the crawl's scope and frontier while the crawl runs.
+    """
+    domain = urlparse(normalize_url(start_url)).netloc
+    sink = sink or MemorySink()
+    workers = max(1, workers)
+    per_host = per_host or workers
+
+    hosts = {domain}
+    if checkpoint:
+        # A resumed scan keeps the hosts an earlier enumeration added to its scope.
+        hosts.update(urlparse(normalize_url(url)).netloc for url in checkpoint.done_urls() + checkpoint.pending_urls())
+    scheduler = open_frontier(start_url, max_pages, per_host, discover, checkpoint)
+    scope = browser_scope(domain)
+    if subdomains:
+        scope.append(subdomains.domain)
+        seed_subdomains(subdomains, scheduler, hosts)
 
-        visited.add(url)
+    def worker(probe):
+        while True:
+            url = scheduler.next_url()
+            if url is None:
+                return
+            try:
+                page_results, links = probe(url)
+                with METRICS.span("sink_write"):
+                    for result in page_results:
+                        sink.write(result)
+                scheduler.add(links)
+                if checkpoint:
+                    # Results must be on disk before the page counts as done.
+                    sink.flush()
+                    checkpoint.complete(url)
+            except Exception as e:
+                logger.error(f"Worker failed on {url}: {e}")
+            finally:
+                scheduler.done(url)
+
+    with page_probe(scope, hosts, pool_size, recycle_after, workers, http_first, form_cache) as probe:
+        if workers == 1:
+            worker(probe)
+        else:
+            threads = [threading.Thread(target=worker, args=(probe,), name=f"crawl-worker-{i}", daemon=True)
+                       for i in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                # Join with a timeout so the main thread keeps handling SIGINT.
+                while thread.is_alive():
+                    thread.join(0.5)
+
+    sink.flush()
+    logger.info(f"Crawl completed. Pages visited: {scheduler.visited}. Total results: {sink.count}")
+    return sink
+
+def coordinate_scan(start_url, address, max_pages=100, per_host=MAX_PER_HOST, discover=DISCOVER_LINKS,
+                    checkpoint=None, sink=None, token=None, lease_timeout=LEASE_TIMEOUT):
+    """Serve a scan's frontier on ``address`` ([HOST:]PORT) to workers started with run_scan_worker.
+
+    The coordinator probes nothing itself: it leases URLs, collects the
+    results workers report into ``sink`` and returns it once the scan is over.
+    Without ``per_host``, pages of one host are leased to as many workers
+    as ask for them.
+    """
+    sink = sink or MemorySink()
+    scheduler = open_frontier(start_url, max_pages, per_host or max_pages, discover, checkpoint)
+    domain = urlparse(normalize_url(start_url)).netloc
+    coordinator = ScanCoordinator(scheduler, sink, checkpoint, {"start_url": start_url, "domain": domain},
+                                  lease_timeout=lease_timeout, token=token, hosts={domain})
+    host, port = coordinator_address(address)
+    coordinator.serve(host, port)
+    logger.info(f"Crawl completed. Pages visited: {scheduler.visited}. Total results: {sink.count}")
+    return sink
+
+def coordinator_address(address):
+    """Split a --coordinator address ([HOST:]PORT) into (host, port), defaulting to loopback."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def run_scan_worker(coordinator_url, pool_size=DRIVER_POOL_SIZE, recycle_after=DRIVER_RECYCLE_AFTER,
+                    workers=CRAWL_WORKERS, http_first=HTTP_FIRST, form_cache=None, token=None):
+    """Probe URLs leased from a coordinator (see coordinate_scan) until its scan is over."""
+    scan_worker = ScanWorker(coordinator_url, token=token, should_stop=lambda: interrupted)
+    try:
+        domain = scan_worker.scan_info()["domain"]
+    except requests.HTTPError as e:
+        raise SystemExit(f"Coordinator {coordinator_url} refused the worker (bad token or coordinator error): {e}")
+    except requests.RequestException as e:
+        raise SystemExit(f"Could not reach coordinator {coordinator_url}: {e}")
+    workers = max(1, workers)
+    with page_probe(browser_scope(domain), {domain}, pool_size, recycle_after, workers, http_first,
+                    form_cache) as probe:
+        scan_worker.run(probe, workers)
+
+@contextmanager
+def page_probe(scope, hosts, pool_size, recycle_after, workers, http_first, form_cache):
+    """Browser pool and HTTP prober for ``workers`` threads, yielding ``probe(url) -> (results, links)``.
+
+    The pool is closed and pending screenshots are written on exit.
+    """
+    pool = DriverPool(lambda proxy: create_driver(proxy, scope), size=max(pool_size, workers),
+                      recycle_after=recycle_after, proxy_picker=bind_proxy, proxy_release=release_proxy)
+    http_prober = HttpProber(proxy_picker=next_proxy, timeout=HTTP_TIMEOUT) if http_first else None
+
+    def probe(url):
         logger.info(f"Crawling: {url}")
-        
-        driver = create_driver()
-        if not driver:
-            logger.warning(f"Skipping {url} due to driver creation failure.")
-            continue
-        
+        with METRICS.span("page_total"):
+            results, links = crawl_url(url, hosts, pool, http_prober, form_cache)
+        METRICS.count("pages")
+        return results, links
+
+    try:
+        yield probe
+    finally:
+        pool.close()
+        SCREENSHOTS.drain()
+
+def seed_subdomains(enumerator, scheduler, hosts):
+    """Run ``enumerator`` alongside the crawl, adding each live host to ``hosts`` and its URL to the frontier."""
+    def seed(url):
+        netloc = urlparse(normalize_url(url)).netloc
+        if netloc not in hosts:
+            hosts.add(netloc)
+            scheduler.add([url])
+    enumerator.on_live = seed
+    scheduler.open_producer()
+    enumerator.start_in_thread(on_finished=scheduler.close_producer)
+
+def crawl_url(url, hosts, pool, http_prober=None, form_cache=None):
+    """Probe a URL over plain HTTP when possible, escalating to a pooled browser otherwise.
+
+    Returns (results, links), keeping only links to ``hosts`` (netlocs).
+    """
+    if http_prober:
+        with METRICS.span("http_fetch"):
+            page = http_prober.fetch(url)
+        if page and not page.browser_reason:
+            METRICS.count("pages_http")
+            with METRICS.span("http_probe"):
+                results = (http_prober.probe(page, "XSS", payload_selector("XSS"), xss_evidence, form_cache,
+                                             SPOT_CHECK_PAYLOADS) +
+                           http_prober.probe(page, "SQL", payload_selector("SQL"), sql_evidence, form_cache,
+                                             SPOT_CHECK_PAYLOADS))
+            links = [link for link in page.links() if urlparse(normalize_url(link)).netloc in hosts]
+            return results, links
+        if page:
+            logger.info(f"Escalating {url} to the browser: {page.browser_reason}")
+
+    proxy = None
+    try:
+        with pool.lease() as driver:
+            if not driver:
+                logger.warning(f"Skipping {url} due to driver creation failure.")
+                return [], []
+            proxy = pool.proxy_of(driver)
+            load_time = load_page(driver, url)
+            if PROXY_MANAGER and proxy:
+                PROXY_MANAGER.report_success(proxy, load_time)
+            return crawl_page(driver, url, hosts, form_cache)
+    except Exception as e:
+        # The lease marks the browser broken, so its proxy is not reused by it.
+        if PROXY_MANAGER and proxy:
+            PROXY_MANAGER.report_failure(proxy)
+        logger.warning(f"Failed to load {url} via proxy {proxy or 'none'}: {e}")
+        return [], []
+
+def load_page(driver, url):
+    """Navigate to a URL and wait for its body; returns the load time in seconds."""
+    start = time.monotonic()
+    with METRICS.span("page_load"):
+        driver.get(url)
+    actual_url = driver.current_url  # Get the URL after redirects
+    if actual_url != url:
+        logger.info(f"Redirected from {url} to {actual_url}")
+    with METRICS.span("body_wait"):
+        WebDriverWait(driver, 10).until(lambda d: d.find_elements(By.TAG_NAME, "body"))
+    if BROWSER_PROFILE == "lean":
+        # Eager loads return at DOMContentLoaded; give scripts a moment to render the forms.
+        with METRICS.span("render_wait"):
+            wait_for_settle(driver, prepare_settle_wait(driver), SETTLE_TIMEOUT, SETTLE_QUIET)
+    return time.monotonic() - start
+
+def crawl_page(driver, url, hosts, form_cache=None):
+    """Run the injection tests on a loaded page and return (results, links to ``hosts``).
+
+    Links are collected before probing, and a test failing does not keep
+    the other one from running.
+    """
+    results, links = [], []
+    try:
+        # Links resolve against the page as loaded (after redirects), not a normalized spelling of it.
+        base_url = driver.current_url
+        with METRICS.span("page_source"):
+            html = driver.page_source
+        with METRICS.span("parse"):
+            soup = BeautifulSoup(html, 'html.parser')
+        for link in soup.find_all('a', href=True):
+            abs_url = urljoin(base_url, link['href'])
+            if urlparse(normalize_url(abs_url)).netloc in hosts:
+                links.append(abs_url)
+        prober = browser_prober(driver, url)
+        logger.info(f"Found {len(prober.forms)} forms with input fields on {url}")
+        if form_cache:
+            prober.set_fingerprints(page_form_fingerprints(soup, url))
+    except Exception as e:
+        logger.warning(f"Failed to crawl {url}: {e}")
+        return results, links
+
+    for test_name, run_test in (("XSS", test_XSS_script_injection), ("SQL", test_SQL_script_injection)):
         try:
-            driver.get(url)
-            actual_url = driver.current_url  # Get the URL after redirects
-            if actual_url != url:
-                logger.info(f"Redirected from {url} to {actual_url}")
-            WebDriverWait(driver, 10).until(lambda d: d.find_elements(By.TAG_NAME, "body"))
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            inputs = driver.find_elements(By.TAG_NAME, "input")
-            logger.info(f"Found {len(inputs)} input fields on {url}")
-            
-            result_XSS = test_XSS_script_injection(driver, url)
-            logger.info(f"XSS Test Result: {result_XSS}")
-            results.append(result_XSS)
-
-            result_SQL = test_SQL_script_injection(driver, url)
-            logger.info(f"SQL Test Result: {result_SQL}")
-            results.append(result_SQL)
-            
-            for link in soup.find_all('a', href=True):
-                abs_url = urljoin(url, link['href'])
-                if urlparse(abs_url).netloc == domain and abs_url not in visited:
-                    to_crawl.append(abs_url)
+            test_results = run_test(driver, url, None, prober, form_cache)
+            logger.info(f"{test_name} Test Results: {test_results}")
+            results.extend(test_results)
         except Exception as e:
-            logger.warning(f"Failed to crawl {url}: {e}")
-        finally:
-            driver.quit()
-    
-    logger.info(f"Crawl completed. Total results: {len(results)}")
-    return results
+            logger.warning(f"{test_name} test failed on {url}: {e}")
+    return results, links
 
 def save_results(results, domain):
-    """Save test results to a file with detailed output."""
-    output_file = os.path.join(OUTPUT_DIR, f"{domain}_results.txt")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for result in results:
-            f.write(f"URL: {result['url']}\n")
-            f.write(f"Payload: {result['payload']}\n")
-            f.write(f"Vulnerable: {result['vulnerable']}\n")
-            f.write(f"Status: {result['status']}\n")
-            f.write(f"Response Snippet: {result.get('response_snippet', '')}\n")
-            f.write(f"Console Logs: {result.get('console_logs', [])}\n")
-            f.write("-" * 50 + "\n")
-    logger.info(f"Results saved to {output_file}")
+    """Save test results to a file with detailed output.
+
+    ``results`` is a list of results or the MemorySink crawl_website returns.
+    """
+    if isinstance(results, MemorySink):
+        results = results.results
+    sink = TextSink(os.path.join(OUTPUT_DIR, f"{domain}_results.txt"))
+    for result in results:
+        sink.write(result)
+    sink.close()
+    logger.info(f"Results saved to {sink.path}")
+
+def output_formats(value):
+    """argparse type for a comma-separated list of result formats."""
+    formats = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in formats if name not in SINK_TYPES]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown output format(s) {unknown}; choose from {sorted(SINK_TYPES)}")
+    return formats
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Crawl a website and test for script injection.")
     parser.add_argument("domain", help="Domain to crawl (e.g., http://localhost:3000)", nargs='?', default="http://localhost:3000")
     parser.add_argument("--max-pages", type=int, default=100, help="Max pages to crawl")
+    parser.add_argument("--pool-size", type=int, default=DRIVER_POOL_SIZE, help="Max browser instances kept alive for reuse")
+    parser.add_argument("--recycle-after", type=int, default=DRIVER_RECYCLE_AFTER, help="Restart a browser after serving this many pages")
+    parser.add_argument("--page-timeout", type=float, default=PAGE_LOAD_TIMEOUT, help="Seconds before a page load fails and its proxy is quarantined")
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS, help="Number of concurrent browser workers")
+    parser.add_argument("--per-host", type=int, default=MAX_PER_HOST, help="Max concurrent pages per host (default: one per --workers, so a single-site scan uses every worker)")
+    parser.add_argument("--browser-profile", choices=BROWSER_PROFILES, default=BROWSER_PROFILE, help="full (default) loads pages like a regular browser; lean skips images, fonts, media and off-scope hosts and returns from loads at DOMContentLoaded, which breaks forms needing scripts from other hosts unless they are allowed with --allow-host")
+    parser.add_argument("--allow-host", metavar="HOST", action="append", default=[], help="Host (and its subdomains) a lean browser may load resources from besides the scanned one, e.g. a CDN serving the form's scripts (repeatable)")
+    parser.add_argument("--http-first", action="store_true", help="Probe server-rendered pages over plain HTTP and only use a browser for JavaScript-driven forms")
+    parser.add_argument("--discover", action="store_true", help="Run an async link discovery crawler ahead of the probing workers")
+    parser.add_argument("--form-cache", action="store_true", help=f"Only spot-check forms already probed in this scan or a previous one (cached in {FORM_CACHE_FILE})")
+    parser.add_argument("--form-cache-ttl", type=float, default=FORM_CACHE_TTL / 3600, help="Hours a cached form fingerprint stays valid")
+    parser.add_argument("--spot-check", type=int, default=SPOT_CHECK_PAYLOADS, help="Payloads sent to an already-probed form (0 skips it)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted scan from its checkpoint instead of starting over")
+    parser.add_argument("--output-format", type=output_formats, default=["text"], help="Comma-separated result formats streamed during the scan: text, jsonl, sqlite")
+    parser.add_argument("--settle-timeout", type=float, default=SETTLE_TIMEOUT, help="Max seconds to wait for a page to settle after submitting a payload")
+    parser.add_argument("--payloads", metavar="PATH", action="append", default=[], help="Payload file or directory added to the built-in payloads (repeatable); see payloadCorpus for the format")
+    parser.add_argument("--subdomains", action="store_true", help="Also scan the live subdomains of the domain, enumerated over DNS from wordlists (only for authorized scope-wide assessments)")
+    parser.add_argument("--wordlist", metavar="PATH", action="append", default=[], help="Subdomain wordlist replacing the bundled ones (repeatable)")
+    parser.add_argument("--resolver", metavar="IP[:PORT]", action="append", default=[], help="DNS server for subdomain enumeration (repeatable; default: the system's)")
+    parser.add_argument("--dns-concurrency", type=int, default=DNS_CONCURRENCY, help="DNS queries in flight during subdomain enumeration")
+    parser.add_argument("--coordinator", metavar="[HOST:]PORT", help="Serve the scan's frontier to --worker processes instead of probing locally (use 0.0.0.0:PORT with --token to accept workers from other hosts)")
+    parser.add_argument("--worker", metavar="URL", help="Probe URLs leased from the coordinator at URL; domain, checkpoint and output belong to the coordinator")
+    parser.add_argument("--lease-timeout", type=float, default=LEASE_TIMEOUT, help="Seconds without a renewal after which a worker's URL is handed to another worker")
+    parser.add_argument("--token", default=os.environ.get("FORMPROBER_TOKEN"), help="Shared secret between coordinator and workers (default: $FORMPROBER_TOKEN)")
+    parser.add_argument("--screenshots", choices=SCREENSHOT_POLICIES, default=SCREENSHOT_POLICY, help="Which browser probes get a screenshot of the probed form")
+    parser.add_argument("--screenshot-budget", type=float, default=SCREENSHOT_BUDGET_MB, help="MB of screenshots after which no more are taken in this scan")
+    parser.add_argument("--screenshot-format", choices=sorted(SCREENSHOT_FORMATS), default=SCREENSHOT_FORMAT, help="Image format screenshots are encoded to (needs Pillow)")
+    parser.add_argument("--no-screenshot-crop", action="store_true", help="Capture the whole viewport instead of just the probed form")
+    parser.add_argument("--metrics", metavar="PATH", help="Record per-phase timings and write them to PATH at the end of the run (Prometheus text format for .prom files, JSON otherwise)")
     args = parser.parse_args()
+    if args.coordinator and args.worker:
+        parser.error("--coordinator and --worker are mutually exclusive")
+    if args.subdomains and (args.coordinator or args.worker):
+        parser.error("--subdomains is only supported for local scans")
+    if args.coordinator and not args.token and not is_loopback(coordinator_address(args.coordinator)[0]):
+        parser.error("--coordinator on a non-loopback address needs --token (or $FORMPROBER_TOKEN)")
     
     if not args.domain.startswith(('http://', 'https://')):
         args.domain = f"http://{args.domain}"
     
+    SETTLE_TIMEOUT = args.settle_timeout
+    PAGE_LOAD_TIMEOUT = args.page_timeout
+    SPOT_CHECK_PAYLOADS = args.spot_check
+    BROWSER_PROFILE = args.browser_profile
+    ALLOW_HOSTS = args.allow_host
+    if args.metrics:
+        METRICS.enable()
+    SCREENSHOTS.close()  # The import-time default; replaced by one configured from the arguments
+    SCREENSHOTS = ScreenshotPipeline(OUTPUT_DIR, args.screenshots, int(args.screenshot_budget * 1024 * 1024),
+                                     args.screenshot_format, crop=not args.no_screenshot_crop, metrics=METRICS)
+    for path in args.payloads:
+        try:
+            PAYLOADS.add(path)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+    if args.payloads:
+        DETECTOR = build_detector(PAYLOADS)
+        logger.info(f"Payload corpus: {sum(1 for _ in PAYLOADS.select('XSS'))} XSS and "
+                    f"{sum(1 for _ in PAYLOADS.select('SQL'))} SQL payloads")
     domain = urlparse(args.domain).netloc
-    results = crawl_website(args.domain, args.max_pages)
-    save_results(results, domain)
\ No newline at end of file
+    form_cache = FormCache(FORM_CACHE_FILE, ttl=args.form_cache_ttl * 3600) if args.form_cache else None
+    subdomains = None
+    if args.subdomains:
+        try:
+            words = load_wordlists(args.wordlist or SUBDOMAIN_WORDLISTS)
+        except OSError as e:
+            parser.error(str(e))
+        resolver = DnsResolver(args.resolver or system_nameservers(), concurrency=args.dns_concurrency)
+        subdomains = SubdomainEnumerator(urlparse(args.domain).hostname, words, resolver, proxy_picker=next_proxy,
+                                         should_stop=lambda: interrupted)
+
+    def save_state():
+        SCREENSHOTS.close()
+        if form_cache:
+            form_cache.save()
+        if PROXY_MANAGER:
+            PROXY_MANAGER.save()
+        if args.metrics:
+            METRICS.log_summary()
+            METRICS.write(args.metrics)
+
+    if args.worker:
+        try:
+            run_scan_worker(args.worker, args.pool_size, args.recycle_after, args.workers, args.http_first,
+                            form_cache, args.token)
+        finally:
+            save_state()
+    else:
+        checkpoint = ScanCheckpoint(os.path.join(OUTPUT_DIR, f"{domain}_checkpoint.db"), resume=args.resume)
+        if args.resume and checkpoint.get_meta("start_url") not in (None, normalize_url(args.domain)):
+            parser.error(f"Checkpoint belongs to a scan of {checkpoint.get_meta('start_url')}")
+        # A resumed scan appends to the output of the interrupted run.
+        sink = open_sinks(args.output_format, os.path.join(OUTPUT_DIR, f"{domain}_results"), append=args.resume)
+        try:
+            if args.coordinator:
+                coordinate_scan(args.domain, args.coordinator, args.max_pages, args.per_host, args.discover,
+                                checkpoint, sink, args.token, args.lease_timeout)
+            else:
+                crawl_website(args.domain, args.max_pages, args.pool_size, args.recycle_after,
+                              args.workers, args.per_host, args.http_first,
+                              args.discover, form_cache, checkpoint, sink, subdomains)
+        finally:
+            sink.close()
+            checkpoint.close()
+            save_state()
+        logger.info(f"Saved {sink.count} results")
\ No newline at end of file
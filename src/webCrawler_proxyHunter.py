@@ -1,29 +1,60 @@
 import praw
+import argparse
+import asyncio
 import json
 import os
-import re
 import requests
 from datetime import datetime
 import pytz
 from github import Github
 from duckduckgo_search import DDGS
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 import time
-import random
+from urllib.parse import urlparse
+import aiohttp
 import backoff
+from sourceCache import SourceCache, content_hash
+from proxyExtractor import extract_proxies
+from rateLimiter import RateLimiter
+from proxyPipeline import ProxyPipeline, ProxyFileWriter
+from scanMetrics import ScanMetrics
 
 # Configuration
 CONFIG_FILE = "../config/grokCrawler.json"
 OUTPUT_DIR = "Output"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "proxy_servers.txt")
 PROXY_LIST_FILE = os.path.join(OUTPUT_DIR, "proxy_list.txt")
+SOURCE_CACHE_FILE = os.path.join(OUTPUT_DIR, "source_cache.json")
+
+# Proxy validation; the test URL can be overridden with "proxy_test_url" in the config
+PROXY_TEST_URL = "https://www.google.com"
+VALIDATION_CONCURRENCY = 1000
+VALIDATION_TIMEOUT = 5
+VALIDATION_CONNECT_TIMEOUT = 3
+
+# Harvest throttling: (requests per second, burst) per source, a default per
+# scraped host, and one budget of concurrent requests shared by all sources
+SOURCE_RATE_LIMITS = {
+    "reddit": (1.0, 5),
+    "github_search": (0.5, 2),
+    "github": (1.3, 10),
+    "duckduckgo": (0.5, 1),
+}
+HOST_RATE_LIMIT = (2.0, 4)
+MAX_CONCURRENT_REQUESTS = 32
+
+# Per-phase timings; only collected when enabled with --metrics
+METRICS = ScanMetrics(prefix="proxyhunter")
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+SOURCE_CACHE = SourceCache(SOURCE_CACHE_FILE)
+RATE_LIMITER = RateLimiter(SOURCE_RATE_LIMITS, HOST_RATE_LIMIT, MAX_CONCURRENT_REQUESTS)
+
 # --- Utility Functions ---
 def load_config():
     try:
@@ -64,35 +95,46 @@ def init_github():
         logger.error("GitHub authentication failed: %s", e)
         raise
 
-def is_valid_proxy(proxy):
-    try:
-        if ':' in proxy:
-            ip, port = proxy.split(':')
-            port = int(port)
-            if not (0 <= port <= 65535):
-                return False
-        else:
-            ip = proxy
-        octets = ip.split('.')
-        return len(octets) == 4 and all(0 <= int(octet) <= 255 for octet in octets)
-    except (ValueError, IndexError):
-        return False
-
 def find_proxies_in_text(text):
-    proxy_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}(?::\d{1,5})\b'
-    candidates = re.findall(proxy_pattern, text)
-    valid_proxies = [p for p in candidates if is_valid_proxy(p)]
-    if valid_proxies:
-        logger.info("Found proxies: %s", valid_proxies)
-    return valid_proxies
+    """Return the unique ip:port proxies in a str or bytes document."""
+    with METRICS.span("extract"):
+        proxies = extract_proxies(text)
+    if proxies:
+        logger.debug("Found %d proxies", len(proxies))
+    return proxies
 
 @backoff.on_exception(backoff.expo, (requests.RequestException, requests.Timeout), max_tries=3)
 def scrape_url(url):
+    """Scrape proxies from a URL, reusing cached results when the page has not changed."""
+    cache_key = f"url:{url}"
+    cached = SOURCE_CACHE.get(cache_key)
     try:
         headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        response = requests.get(url, headers=headers, timeout=10)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        host_key = f"host:{urlparse(url).hostname}"
+        with RATE_LIMITER.slot(host_key), METRICS.span("scrape"):
+            response = requests.get(url, headers=headers, timeout=10)
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            RATE_LIMITER.pause(host_key, int(retry_after) if retry_after.isdigit() else 30)
+        if response.status_code == 304 and cached:
+            SOURCE_CACHE.record(hit=True)
+            logger.debug("Not modified since last harvest: %s", url)
+            return cached["proxies"]
         response.raise_for_status()
-        proxies = find_proxies_in_text(response.text)
+        page_hash = content_hash(response.content)
+        if cached and cached.get("content_hash") == page_hash:
+            SOURCE_CACHE.record(hit=True)
+            proxies = cached["proxies"]
+        else:
+            SOURCE_CACHE.record(hit=False)
+            proxies = find_proxies_in_text(response.content)
+        SOURCE_CACHE.put(cache_key, etag=response.headers.get("ETag"),
+                         last_modified=response.headers.get("Last-Modified"),
+                         content_hash=page_hash, proxies=proxies)
         logger.info("Scraped %s: found %d proxies", url, len(proxies))
         return proxies
     except requests.RequestException as e:
@@ -100,13 +142,36 @@ def scrape_url(url):
         return []
 
 # --- Optimized Crawling Functions with Threading and Error Handling ---
+# Each source runs one coordinator thread that performs its (rate-limited)
+# searches and fans the results out to a task pool shared by all sources.
+# Tasks on that pool never wait on other tasks, so it cannot deadlock.
+# Each task's proxies go to the validation pipeline as soon as it finishes.
+
+def feed_pipeline(pipeline, future, description):
+    """Hand a harvest task's proxies to the pipeline once it finishes; returns the future."""
+    def done(future):
+        try:
+            pipeline.submit(future.result())
+        except Exception as e:
+            logger.error("Failed to process %s: %s", description, e)
+    future.add_done_callback(done)
+    return future
 
-def crawl_reddit_submission(submission):
+def crawl_reddit_submission(submission, writer):
     """Process a single Reddit submission and its URL with retry logic."""
-    proxies = []
-    text = submission.title + " " + (submission.selftext if submission.is_self else "")
-    found_proxies = find_proxies_in_text(text)
-    proxies.extend(found_proxies)
+    cache_key = f"reddit:{submission.id}"
+    cached = SOURCE_CACHE.get(cache_key)
+    if cached and cached.get("edited") == submission.edited:
+        # Unedited since the last harvest; its linked page is still re-checked
+        # through scrape_url's conditional fetch.
+        SOURCE_CACHE.record(hit=True)
+        found_proxies = cached["proxies"]
+    else:
+        SOURCE_CACHE.record(hit=False)
+        text = submission.title + " " + (submission.selftext if submission.is_self else "")
+        found_proxies = find_proxies_in_text(text)
+        SOURCE_CACHE.put(cache_key, edited=submission.edited, proxies=found_proxies)
+    proxies = list(found_proxies)
 
     url_proxies = []
     if submission.url and not submission.url.startswith("https://www.reddit.com"):
@@ -116,107 +181,110 @@ def crawl_reddit_submission(submission):
         except Exception as e:
             logger.error("Failed to scrape URL %s from submission %s: %s", submission.url, submission.id, e)
 
-    data = {
+    writer.record({
         "timestamp": datetime.now(pytz.UTC).isoformat(),
         "subreddit": submission.subreddit.display_name,
         "title": submission.title,
         "url": submission.url,
         "proxies": found_proxies + url_proxies
-    }
-    try:
-        with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data) + "\n")
-    except IOError as e:
-        logger.error("Failed to write submission data for %s: %s", submission.id, e)
+    })
     return proxies
 
-def crawl_reddit_for_proxies(reddit, subreddit, term, max_retries=3):
-    """Crawl a single subreddit with a search term, with retries."""
-    proxies = []
+def search_reddit(reddit, subreddit, term, max_retries=3):
+    """Search a single subreddit for a term, with retries; returns the submissions."""
     for attempt in range(max_retries):
         try:
             logger.info("Crawling r/%s for '%s' (attempt %d/%d)", subreddit, term, attempt + 1, max_retries)
-            submissions = list(reddit.subreddit(subreddit).search(term, limit=50))
+            with RATE_LIMITER.slot("reddit"), METRICS.span("reddit_search"):
+                submissions = list(reddit.subreddit(subreddit).search(term, limit=50))
             logger.info("Fetched %d submissions from r/%s", len(submissions), subreddit)
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_submission = {executor.submit(crawl_reddit_submission, sub): sub for sub in submissions}
-                for future in as_completed(future_to_submission):
-                    try:
-                        proxies.extend(future.result())
-                    except Exception as e:
-                        sub = future_to_submission[future]
-                        logger.error("Failed to process submission %s: %s", sub.id, e)
-            time.sleep(random.uniform(2, 5))  # Rate limit delay
-            break
+            return submissions
         except Exception as e:
             logger.error("Error in r/%s for '%s' (attempt %d): %s", subreddit, term, attempt + 1, e)
             if attempt < max_retries - 1:
                 time.sleep(2 ** attempt)  # Exponential backoff
             else:
                 logger.error("Max retries reached for r/%s '%s'", subreddit, term)
-    return proxies
+    return []
 
-def crawl_reddit_parallel():
+def crawl_reddit_parallel(pool, pipeline, writer):
     reddit = init_reddit()
     subreddits = ["hacking", "pentest", "proxies", "netsec", "all"]
     search_terms = ["free proxy list", "working proxies 2025", "fresh proxies"]
-    proxies = []
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_task = {
-            executor.submit(crawl_reddit_for_proxies, reddit, subreddit, term): (subreddit, term)
-            for subreddit in subreddits
-            for term in search_terms
-        }
-        for future in as_completed(future_to_task):
-            subreddit, term = future_to_task[future]
-            try:
-                proxies.extend(future.result())
-            except Exception as e:
-                logger.error("Failed task r/%s '%s': %s", subreddit, term, e)
-    return proxies
+    future_to_search = {
+        pool.submit(search_reddit, reddit, subreddit, term): (subreddit, term)
+        for subreddit in subreddits
+        for term in search_terms
+    }
+    seen = set()
+    tasks = []
+    for future in as_completed(future_to_search):
+        for submission in future.result():
+            if submission.id not in seen:
+                seen.add(submission.id)
+                tasks.append(feed_pipeline(pipeline, pool.submit(crawl_reddit_submission, submission, writer),
+                                           f"submission {submission.id}"))
+    wait(tasks)
 
 def crawl_github_repo(repo):
-    """Process a single GitHub repository with error handling."""
+    """Process a single GitHub repository, skipping unchanged repos and files."""
     proxies = []
     logger.debug("Processing repo: %s", repo.full_name)
+    repo_key = f"repo:{repo.full_name}"
+    pushed_at = repo.pushed_at.isoformat() if repo.pushed_at else None
+    cached_repo = SOURCE_CACHE.get(repo_key)
+    if cached_repo and pushed_at and cached_repo.get("pushed_at") == pushed_at:
+        cached_blobs = [SOURCE_CACHE.get(f"blob:{sha}") for sha in cached_repo.get("blobs", [])]
+        if all(cached_blobs):
+            SOURCE_CACHE.record(hit=True)
+            logger.debug("Repo %s unchanged since last harvest", repo.full_name)
+            for blob in cached_blobs:
+                proxies.extend(blob["proxies"])
+            return proxies
     try:
-        contents = repo.get_contents("")
+        with RATE_LIMITER.slot("github"), METRICS.span("github_fetch"):
+            contents = repo.get_contents("")
+        blobs = []
         for content_file in contents:
             if content_file.type == "file" and content_file.name.endswith((".txt", ".md")):
+                blob_key = f"blob:{content_file.sha}"
+                blobs.append(content_file.sha)
+                cached_blob = SOURCE_CACHE.get(blob_key)
+                if cached_blob:
+                    SOURCE_CACHE.record(hit=True)
+                    proxies.extend(cached_blob["proxies"])
+                    continue
                 try:
-                    file_content = content_file.decoded_content.decode("utf-8", errors="ignore")
+                    SOURCE_CACHE.record(hit=False)
+                    with RATE_LIMITER.slot("github"), METRICS.span("github_fetch"):
+                        file_content = content_file.decoded_content
                     found_proxies = find_proxies_in_text(file_content)
                     proxies.extend(found_proxies)
+                    SOURCE_CACHE.put(blob_key, proxies=found_proxies)
                     if found_proxies:
                         logger.info("Found %d proxies in %s/%s", len(found_proxies), repo.full_name, content_file.name)
                 except Exception as e:
                     logger.error("Failed to process file %s in %s: %s", content_file.name, repo.full_name, e)
-        time.sleep(1)
+        SOURCE_CACHE.put(repo_key, pushed_at=pushed_at, blobs=blobs)
     except Exception as e:
         logger.error("Error in repo %s: %s", repo.full_name, e)
     return proxies
 
-def crawl_github_for_proxies(search_query="proxy list"):
+def crawl_github_for_proxies(pool, pipeline, search_query="proxy list"):
     g = init_github()
-    proxies = []
     logger.info("Starting GitHub search for '%s'...", search_query)
     try:
-        repos = list(g.search_repositories(query=search_query, sort="updated", order="desc"))[:10]
+        with RATE_LIMITER.slot("github_search"), METRICS.span("github_search"):
+            # Slicing the paginated result only fetches the first page
+            repos = list(g.search_repositories(query=search_query, sort="updated", order="desc")[:10])
         logger.info("Found %d repositories", len(repos))
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_repo = {executor.submit(crawl_github_repo, repo): repo for repo in repos}
-            for future in as_completed(future_to_repo):
-                try:
-                    proxies.extend(future.result())
-                except Exception as e:
-                    repo = future_to_repo[future]
-                    logger.error("Failed to process repo %s: %s", repo.full_name, e)
     except Exception as e:
         logger.error("GitHub crawl error: %s", e)
-    return proxies
+        return
+    wait([feed_pipeline(pipeline, pool.submit(crawl_github_repo, repo), f"repo {repo.full_name}") for repo in repos])
 
-def crawl_duckduckgo_result(result):
+def crawl_duckduckgo_result(result, writer):
     """Process a single DuckDuckGo search result with error handling."""
     proxies = []
     text = f"{result.get('title', '')} {result.get('body', '')}"
@@ -224,6 +292,7 @@ def crawl_duckduckgo_result(result):
     proxies.extend(found_proxies)
 
     url = result.get("href", "")
+    url_proxies = []
     if url:
         try:
             url_proxies = scrape_url(url)
@@ -231,104 +300,151 @@ def crawl_duckduckgo_result(result):
         except Exception as e:
             logger.error("Failed to scrape DuckDuckGo URL %s: %s", url, e)
 
-    data = {
+    writer.record({
         "timestamp": datetime.now(pytz.UTC).isoformat(),
         "title": result.get("title", ""),
         "url": url,
         "proxies": found_proxies + url_proxies
-    }
-    try:
-        with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data) + "\n")
-    except IOError as e:
-        logger.error("Failed to write DuckDuckGo result %s: %s", url, e)
+    })
     return proxies
 
-def crawl_duckduckgo_for_proxies(search_query="free proxy list site:*.org site:*.edu site:*.gov -inurl:(login signup)", max_results=50):
-    proxies = []
+def crawl_duckduckgo_for_proxies(pool, pipeline, writer, search_query="free proxy list site:*.org site:*.edu site:*.gov -inurl:(login signup)", max_results=50):
     logger.info("Starting DuckDuckGo search for '%s'...", search_query)
+    results = []
     for attempt in range(3):
         try:
-            with DDGS() as ddgs:
+            with RATE_LIMITER.slot("duckduckgo"), METRICS.span("duckduckgo_search"), DDGS() as ddgs:
                 results = list(ddgs.text(search_query, max_results=max_results))
-                logger.info("Fetched %d results", len(results))
-                with ThreadPoolExecutor(max_workers=10) as executor:
-                    future_to_result = {executor.submit(crawl_duckduckgo_result, result): result for result in results}
-                    for future in as_completed(future_to_result):
-                        try:
-                            proxies.extend(future.result())
-                        except Exception as e:
-                            result = future_to_result[future]
-                            logger.error("Failed to process DuckDuckGo result %s: %s", result.get("href", "unknown"), e)
-                        time.sleep(random.uniform(1, 3))
-                break
+            logger.info("Fetched %d results", len(results))
+            break
         except Exception as e:
             logger.error("DuckDuckGo attempt %d failed: %s", attempt + 1, e)
             if attempt < 2:
                 time.sleep(2 ** attempt)  # Exponential backoff
             else:
                 logger.error("DuckDuckGo crawl failed after 3 attempts")
-    return proxies
+    wait([feed_pipeline(pipeline, pool.submit(crawl_duckduckgo_result, result, writer),
+                        f"DuckDuckGo result {result.get('href', 'unknown')}") for result in results])
 
-@backoff.on_exception(backoff.expo, (requests.RequestException, requests.Timeout), max_tries=3)
-def test_proxy(proxy, timeout=5):
-    try:
-        proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
-        response = requests.get("https://www.google.com", proxies=proxies, timeout=timeout)
-        logger.debug("Proxy %s tested: %s", proxy, response.status_code)
-        return response.status_code == 200
-    except requests.RequestException as e:
-        logger.debug("Proxy %s failed: %s", proxy, e)
-        return False
-
-def validate_and_filter_proxies(proxies, max_workers=20):
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_proxy = {executor.submit(test_proxy, proxy): proxy for proxy in proxies}
-        results = []
-        for future in as_completed(future_to_proxy):
-            proxy = future_to_proxy[future]
-            try:
-                results.append((proxy, future.result()))
-            except Exception as e:
-                logger.error("Failed to validate proxy %s: %s", proxy, e)
-    valid_proxies = [p for p, r in results if r]
-    logger.info("Validated %d/%d proxies", len(valid_proxies), len(proxies))
-    return valid_proxies
+async def test_proxy(session, proxy, test_url, timeout=VALIDATION_TIMEOUT, max_tries=2):
+    """Fetch test_url through the proxy; returns the latency in seconds, or None if it failed.
 
-def save_proxy_list(proxies):
-    unique_proxies = sorted(set(proxies))
-    try:
-        with open(PROXY_LIST_FILE, "w", encoding="utf-8") as f:
-            for proxy in unique_proxies:
-                f.write(f"{proxy}\n")
-        logger.info("Saved %d proxies to %s", len(unique_proxies), PROXY_LIST_FILE)
-    except IOError as e:
-        logger.error("Failed to save proxy list: %s", e)
+    Connection failures abort immediately. Only dropped or truncated
+    responses are retried, since a refused or unreachable proxy will not
+    recover within a run.
+    """
+    client_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=min(timeout, VALIDATION_CONNECT_TIMEOUT))
+    for attempt in range(max_tries):
+        start = time.monotonic()
+        try:
+            async with session.get(test_url, proxy=f"http://{proxy}", timeout=client_timeout,
+                                   allow_redirects=False) as response:
+                latency = time.monotonic() - start
+                logger.debug("Proxy %s tested: %s in %.3fs", proxy, response.status, latency)
+                return latency if response.status == 200 else None
+        except (aiohttp.ClientConnectorError, aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError,
+                asyncio.TimeoutError) as e:
+            logger.debug("Proxy %s failed: %s", proxy, e)
+            return None
+        except (aiohttp.ServerDisconnectedError, aiohttp.ClientPayloadError) as e:
+            logger.debug("Proxy %s dropped the connection (attempt %d): %s", proxy, attempt + 1, e)
+        except aiohttp.ClientError as e:
+            logger.debug("Proxy %s failed: %s", proxy, e)
+            return None
+    return None
 
-def crawl_all_sources():
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        future_reddit = executor.submit(crawl_reddit_parallel)
-        future_github = executor.submit(crawl_github_for_proxies)
-        future_ddgo = executor.submit(crawl_duckduckgo_for_proxies)
+def start_validation(test_url=PROXY_TEST_URL, concurrency=VALIDATION_CONCURRENCY, timeout=VALIDATION_TIMEOUT,
+                     on_valid=None):
+    """Start a ProxyPipeline testing proxies against test_url, ``concurrency`` at a time."""
+    concurrency = min(concurrency, max_open_connections())
 
-        reddit_proxies = future_reddit.result()
-        github_proxies = future_github.result()
-        ddgo_proxies = future_ddgo.result()
+    async def check(session, proxy):
+        with METRICS.span("proxy_test"):
+            return await test_proxy(session, proxy, test_url, timeout)
 
-    all_proxies = reddit_proxies + github_proxies + ddgo_proxies
-    unique_proxies = list(set(all_proxies))
-    logger.info("Collected %d unique proxies", len(unique_proxies))
+    def session_factory():
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency, force_close=True))
 
-    valid_proxies = validate_and_filter_proxies(unique_proxies)
+    return ProxyPipeline(check, session_factory, concurrency, on_valid).start()
+
+def max_open_connections(reserve=64):
+    """Concurrency ceiling that stays below the process's open file limit."""
+    try:
+        import resource
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        return max(1, soft_limit - reserve)
+    except (ImportError, ValueError):
+        return 500
+
+def finish_validation(pipeline, test_url, start):
+    """Wait for a pipeline to test everything submitted; returns the working proxies, fastest first."""
+    with METRICS.span("validate"):
+        latencies = pipeline.close()
+    valid_proxies = sorted(latencies, key=latencies.get)
+    METRICS.count("proxies_tested", pipeline.tested)
+    METRICS.count("proxies_valid", len(valid_proxies))
+    if pipeline.first_valid_after is not None:
+        METRICS.observe("first_valid_proxy", pipeline.first_valid_after)
+    logger.info("Validated %d/%d proxies against %s in %.1fs", len(valid_proxies), pipeline.tested, test_url,
+                time.monotonic() - start)
     if valid_proxies:
-        save_proxy_list(valid_proxies)
+        logger.info("Fastest proxy %s (%.3fs), median latency %.3fs", valid_proxies[0],
+                    latencies[valid_proxies[0]], latencies[valid_proxies[len(valid_proxies) // 2]])
+    return valid_proxies
+
+def validate_and_filter_proxies(proxies, test_url=PROXY_TEST_URL, concurrency=VALIDATION_CONCURRENCY,
+                                timeout=VALIDATION_TIMEOUT):
+    """Return the working proxies, fastest first."""
+    start = time.monotonic()
+    pipeline = start_validation(test_url, concurrency, timeout)
+    pipeline.submit(proxies)
+    return finish_validation(pipeline, test_url, start)
+
+def crawl_all_sources():
+    """Harvest all sources while validating what they find; returns the working proxies, fastest first.
+
+    Working proxies are appended to the proxy list as soon as they are
+    found, so a form prober started mid-run already has some to use; the
+    list is rewritten fastest first at the end.
+    """
+    test_url = load_config().get("proxy_test_url", PROXY_TEST_URL)
+    start = time.monotonic()
+    writer = ProxyFileWriter(OUTPUT_FILE, PROXY_LIST_FILE).start()
+    pipeline = start_validation(test_url, on_valid=lambda proxy, latency: writer.add_proxy(proxy))
+    valid_proxies = []
+    try:
+        # Source coordinators get their own threads so they never occupy the task pool they wait on
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="harvest") as pool, \
+                ThreadPoolExecutor(max_workers=3, thread_name_prefix="source") as executor:
+            sources = [executor.submit(crawl_reddit_parallel, pool, pipeline, writer),
+                       executor.submit(crawl_github_for_proxies, pool, pipeline),
+                       executor.submit(crawl_duckduckgo_for_proxies, pool, pipeline, writer)]
+            for source in sources:
+                source.result()
+    finally:
+        SOURCE_CACHE.save()
+        logger.info("Collected %d unique proxies in %.1fs", len(pipeline), time.monotonic() - start)
+        METRICS.count("proxies_harvested", len(pipeline))
+        try:
+            valid_proxies = finish_validation(pipeline, test_url, start)
+        finally:
+            writer.close(valid_proxies)
     return valid_proxies
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harvest proxies from Reddit, GitHub and DuckDuckGo and keep the working ones.")
+    parser.add_argument("--metrics", metavar="PATH", help="Record per-phase timings and write them to PATH at the end of the run (Prometheus text format for .prom files, JSON otherwise)")
+    args = parser.parse_args()
+    if args.metrics:
+        METRICS.enable()
     try:
         list_of_proxy_servers = crawl_all_sources()
         if not list_of_proxy_servers:
             logger.warning("No valid proxies found.")
     except Exception as e:
         logger.critical("Script failed critically: %s", e)
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if args.metrics:
+            METRICS.log_summary()
+            METRICS.write(args.metrics)